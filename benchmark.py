@@ -0,0 +1,183 @@
+"""
+Small benchmark harness shared by the chapters: warm-ups and repeats per input
+size, median/percentile reporting, a fitted growth exponent and JSON/CSV output.
+matplotlib is only imported when a plot is asked for, so it runs headless.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+import csv
+import json
+import math
+import statistics
+import time
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear interpolation between closest ranks, q in [0, 100]."""
+    ordered: List[float] = sorted(values)
+    if not ordered:
+        raise ValueError("percentile of an empty sequence")
+    position: float = (len(ordered) - 1) * q / 100
+    low: int = math.floor(position)
+    high: int = math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+@dataclass
+class Measurement:
+    name: str
+    n: int
+    times: List[float] = field(repr=False)  # seconds per call, one per repeat
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def p90(self) -> float:
+        return percentile(self.times, 90)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.times, 99)
+
+    @property
+    def minimum(self) -> float:
+        return min(self.times)
+
+    def summary(self) -> dict:
+        return {
+            "name": self.name,
+            "n": self.n,
+            "repeats": len(self.times),
+            "min": self.minimum,
+            "median": self.median,
+            "p90": self.p90,
+            "p99": self.p99,
+        }
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    measurements: List[Measurement]
+
+    def growth_exponent(self) -> Optional[float]:
+        """
+        Slope of log(median time) against log(n) by least squares, i.e. k in
+        time ~ n^k. None when there are fewer than two usable sizes.
+        """
+        points: List[Tuple[float, float]] = [
+            (math.log(m.n), math.log(m.median))
+            for m in self.measurements
+            if m.n > 0 and m.median > 0
+        ]
+        if len(points) < 2:
+            return None
+        mean_x: float = statistics.fmean(x for x, _ in points)
+        mean_y: float = statistics.fmean(y for _, y in points)
+        spread: float = sum((x - mean_x) ** 2 for x, _ in points)
+        if spread == 0:
+            return None
+        return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+    def report(self) -> str:
+        header: str = "{:>12} {:>12} {:>12} {:>12}"
+        lines: List[str] = [header.format("n", "median (s)", "p90 (s)", "p99 (s)")]
+        for m in self.measurements:
+            lines.append(
+                "{:>12} {:>12.6f} {:>12.6f} {:>12.6f}".format(
+                    m.n, m.median, m.p90, m.p99
+                )
+            )
+        exponent: Optional[float] = self.growth_exponent()
+        if exponent is not None:
+            lines.append("{}: time ~ n^{:.2f}".format(self.name, exponent))
+        return "\n".join(lines)
+
+    def to_json(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "name": self.name,
+                    "growth_exponent": self.growth_exponent(),
+                    "measurements": [
+                        dict(m.summary(), times=m.times) for m in self.measurements
+                    ],
+                },
+                f,
+                indent=2,
+            )
+
+    def to_csv(self, path: str) -> None:
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(
+                f, fieldnames=["name", "n", "repeats", "min", "median", "p90", "p99"]
+            )
+            writer.writeheader()
+            for m in self.measurements:
+                writer.writerow(m.summary())
+
+    def plot(self, path: Optional[str] = None, show: bool = False) -> None:
+        """Median with a p90 band; saved to path and/or shown, never by default."""
+        import matplotlib.pyplot as plt  # lazy, so headless runs don't need it
+
+        ns: List[int] = [m.n for m in self.measurements]
+        f, ax = plt.subplots()
+        ax.plot(ns, [m.median for m in self.measurements], label=self.name)
+        ax.fill_between(
+            ns,
+            [m.minimum for m in self.measurements],
+            [m.p90 for m in self.measurements],
+            alpha=0.3,
+        )
+        ax.set_xlabel("n"), ax.set_ylabel("Time taken (s)")
+        ax.legend()
+        if path is not None:
+            f.savefig(path)
+        if show:
+            plt.show()
+        plt.close(f)
+
+
+def run_benchmark(
+    function: Callable[..., Any],
+    ns: Iterable[int],
+    arguments: Optional[Callable[[int], Tuple[Any, ...]]] = None,
+    repeat: int = 5,
+    warmup: int = 1,
+    name: Optional[str] = None,
+) -> BenchmarkResult:
+    """
+    Time function(*arguments(n)) for every n: warmup untimed calls, then repeat
+    timed ones. arguments defaults to (n,), and is built outside the timing.
+    """
+    if repeat < 1:
+        raise ValueError("repeat must be positive: {}".format(repeat))
+    arguments = arguments or (lambda n: (n,))
+    measurements: List[Measurement] = []
+    label: str = name or getattr(function, "__name__", repr(function))
+    for n in ns:
+        args: Tuple[Any, ...] = arguments(n)
+        for _ in range(warmup):
+            function(*args)
+        times: List[float] = []
+        for _ in range(repeat):
+            start: float = time.perf_counter()
+            function(*args)
+            times.append(time.perf_counter() - start)
+        measurements.append(Measurement(label, n, times))
+    return BenchmarkResult(label, measurements)
+
+
+if __name__ == "__main__":
+    import random
+
+    result: BenchmarkResult = run_benchmark(
+        sorted,
+        [1000, 10000, 100000],
+        arguments=lambda n: ([random.random() for _ in range(n)],),
+    )
+    print(result.report())
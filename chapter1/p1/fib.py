@@ -1,14 +1,160 @@
-from typing import Dict
+from __future__ import annotations
+from typing import Dict, NamedTuple, Optional, Tuple
+from collections import OrderedDict
+import os
+import pickle
+import sys
 import timeit
-from functools import lru_cache
 
 
-@lru_cache(maxsize=None)
-def fibonacci(n: int) -> int:
+class MemoStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: Optional[int]
+    nbytes: int
+    maxbytes: Optional[int]
+
+
+class MemoStore:
+    """
+    Bounded memo for int -> int results, replacing @lru_cache(maxsize=None).
+    Holds at most maxsize entries and maxbytes bytes of values (as counted by
+    sys.getsizeof), since F(n) grows with n: near n = 10^6 a value is 87 KB.
+    policy is "lru" (a hit refreshes the entry) or "fifo" (oldest insert goes
+    first). With a checkpoint_path, entries are loaded at start and written
+    back by checkpoint(), so a restarted worker is warm right away.
+    """
+
+    POLICIES: Tuple[str, ...] = ("lru", "fifo")
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 4096,
+        policy: str = "lru",
+        checkpoint_path: Optional[str] = None,
+        maxbytes: Optional[int] = 16 * 1024 * 1024,
+    ) -> None:
+        if policy not in self.POLICIES:
+            raise ValueError("Invalid eviction policy:{}".format(policy))
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be positive or None: {}".format(maxsize))
+        if maxbytes is not None and maxbytes < 1:
+            raise ValueError("maxbytes must be positive or None: {}".format(maxbytes))
+        self.maxsize: Optional[int] = maxsize
+        self.maxbytes: Optional[int] = maxbytes
+        self.nbytes: int = 0
+        self.policy: str = policy
+        self.checkpoint_path: Optional[str] = checkpoint_path
+        self._container: OrderedDict[int, int] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        if checkpoint_path is not None and os.path.exists(checkpoint_path):
+            self.load(checkpoint_path)
+
+    def __len__(self) -> int:
+        return len(self._container)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._container
+
+    def get(self, key: int) -> Optional[int]:
+        value: Optional[int] = self._container.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.policy == "lru":
+            self._container.move_to_end(key)
+        return value
+
+    def peek(self, key: int) -> Optional[int]:
+        """Like get, but doesn't touch counters or recency."""
+        return self._container.get(key)
+
+    def put(self, key: int, value: int) -> None:
+        if key in self._container:
+            if self.policy == "lru":
+                self._container.move_to_end(key)
+            self.nbytes -= sys.getsizeof(self._container[key])
+        self._container[key] = value
+        self.nbytes += sys.getsizeof(value)
+        # evict least recent / oldest first, but always keep the newest entry
+        while len(self._container) > 1 and (
+            (self.maxsize is not None and len(self._container) > self.maxsize)
+            or (self.maxbytes is not None and self.nbytes > self.maxbytes)
+        ):
+            self.nbytes -= sys.getsizeof(self._container.popitem(last=False)[1])
+            self.evictions += 1
+
+    def keys(self):
+        return self._container.keys()
+
+    def clear(self) -> None:
+        self._container.clear()
+        self.hits = self.misses = self.evictions = self.nbytes = 0
+
+    def stats(self) -> MemoStats:
+        return MemoStats(
+            self.hits,
+            self.misses,
+            self.evictions,
+            len(self._container),
+            self.maxsize,
+            self.nbytes,
+            self.maxbytes,
+        )
+
+    def checkpoint(self, path: Optional[str] = None) -> None:
+        """Write entries to disk, through a temp file so a crash never leaves half a file."""
+        path = path or self.checkpoint_path
+        if path is None:
+            raise ValueError("No checkpoint path given")
+        tmp_path: str = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(dict(self._container), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def load(self, path: Optional[str] = None) -> None:
+        path = path or self.checkpoint_path
+        if path is None:
+            raise ValueError("No checkpoint path given")
+        with open(path, "rb") as f:
+            entries: Dict[int, int] = pickle.load(f)
+        for key in sorted(entries):  # keep the largest indexes if maxsize is smaller
+            self.put(key, entries[key])
+
+
+fib_memo: MemoStore = MemoStore()
+
+
+def fibonacci(n: int, memo: Optional[MemoStore] = None) -> int:
+    """
+    Memoized Fibonacci without recursion: on a miss, fill forward by addition
+    from the highest cached pair (k - 1, k) below n.
+    """
+    memo = fib_memo if memo is None else memo
     if n < 2:
         return n
-    else:
-        return fibonacci(n - 1) + fibonacci(n - 2)
+    cached: Optional[int] = memo.get(n)
+    if cached is not None:
+        return cached
+    # fill pass starts from the closest pair we already know
+    start: int = 1
+    last: int = 0  # fib(0)
+    next: int = 1  # fib(1)
+    for k in memo.keys():
+        if start < k < n and k - 1 in memo:
+            start, last, next = k, memo.peek(k - 1), memo.peek(k)
+    # don't bother storing values that would be evicted before the loop ends
+    keep_from: int = start if memo.maxsize is None else max(start, n - memo.maxsize)
+    for i in range(start + 1, n + 1):
+        last, next = next, last + next
+        if i > keep_from:
+            memo.put(i, next)
+    return next
 
 
 def fibonacci2(n: int) -> int:
@@ -20,3 +166,5 @@ def fibonacci2(n: int) -> int:
 
 if __name__ == "__main__":
     fibonacci2(50)
+    fibonacci2(5000)  # way past the old recursion limit
+    print(fib_memo.stats())
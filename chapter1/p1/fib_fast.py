@@ -0,0 +1,193 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from functools import lru_cache
+from math import gcd
+import timeit
+
+from fib import fibonacci, fib_memo
+from fib5 import fib5
+
+
+def fib_pair(n: int, m: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Fast-doubling step: returns (F(n), F(n+1)), optionally reduced modulo m.
+    Uses the identities
+        F(2k)   = F(k) * (2*F(k+1) - F(k))
+        F(2k+1) = F(k)^2 + F(k+1)^2
+    walking the bits of n from the most significant one, so there is no recursion.
+    """
+    a: int = 0  # F(0)
+    b: int = 1  # F(1)
+    for bit in bin(n)[2:]:
+        c: int = a * (2 * b - a)  # F(2k)
+        d: int = a * a + b * b  # F(2k+1)
+        if m is not None:
+            c, d = c % m, d % m
+        if bit == "1":
+            a, b = d, c + d  # advance one more step: (F(2k+1), F(2k+2))
+            if m is not None:
+                b %= m
+        else:
+            a, b = c, d
+    return a, b
+
+
+def fib_doubling(n: int) -> int:
+    """O(log n) big-int multiplications instead of n big-int additions."""
+    if n < 0:
+        raise ValueError("n must be non-negative: {}".format(n))
+    return fib_pair(n)[0]
+
+
+def fib_matrix(n: int) -> int:
+    """
+    Same result through [[1, 1], [1, 0]]^n with square-and-multiply.
+    Kept for comparison, fast doubling does about half the multiplications.
+    """
+    if n < 0:
+        raise ValueError("n must be non-negative: {}".format(n))
+    # matrices stored as (a, b, c, d) for [[a, b], [c, d]]
+    result: Tuple[int, int, int, int] = (1, 0, 0, 1)  # identity
+    base: Tuple[int, int, int, int] = (1, 1, 1, 0)
+    while n:
+        if n & 1:
+            result = _mat_mul(result, base)
+        base = _mat_mul(base, base)
+        n >>= 1
+    return result[1]  # top right element is F(n)
+
+
+def _mat_mul(
+    x: Tuple[int, int, int, int], y: Tuple[int, int, int, int]
+) -> Tuple[int, int, int, int]:
+    return (
+        x[0] * y[0] + x[1] * y[2],
+        x[0] * y[1] + x[1] * y[3],
+        x[2] * y[0] + x[3] * y[2],
+        x[2] * y[1] + x[3] * y[3],
+    )
+
+
+def _factorize(m: int) -> Dict[int, int]:
+    factors: Dict[int, int] = {}
+    p: int = 2
+    while p * p <= m:
+        while m % p == 0:
+            factors[p] = factors.get(p, 0) + 1
+            m //= p
+        p += 1 if p == 2 else 2
+    if m > 1:
+        factors[m] = factors.get(m, 0) + 1
+    return factors
+
+
+def _brute_pisano(m: int) -> int:
+    # the sequence mod m is periodic and restarts when (0, 1) shows up again
+    a, b = 0, 1
+    for i in range(1, 6 * m + 1):  # pi(m) <= 6m for every m
+        a, b = b, (a + b) % m
+        if a == 0 and b == 1:
+            return i
+    raise ArithmeticError("Pisano period not found for m={}".format(m))
+
+
+def _prime_pisano(p: int) -> int:
+    """
+    pi(p) for a prime p divides p - 1 when p = +-1 mod 5 and 2(p + 1) when
+    p = +-2 mod 5, so start from that bound and strip prime factors while
+    the shorter length is still a period. Needs no scan over the sequence.
+    """
+    if p == 2:
+        return 3
+    if p == 5:
+        return 20
+    period: int = p - 1 if p % 5 in (1, 4) else 2 * (p + 1)
+    for q in _factorize(period):
+        while period % q == 0 and fib_pair(period // q, p) == (0, 1):
+            period //= q
+    return period
+
+
+@lru_cache(maxsize=128)
+def pisano_period(m: int) -> int:
+    """
+    Period of F(n) mod m. Computed from the prime factorization of m:
+    pi(m) = lcm(pi(p^k)) and pi(p^k) = p^(k-1) * pi(p), so only the primes
+    need to be solved.
+    """
+    if m < 1:
+        raise ValueError("modulus must be positive: {}".format(m))
+    if m == 1:
+        return 1
+    period: int = 1
+    for p, k in _factorize(m).items():
+        prime_power: int = p**k
+        candidate: int = p ** (k - 1) * _prime_pisano(p)
+        # p^(k-1) * pi(p) is only conjectured (Wall), so double check it
+        if fib_pair(candidate, prime_power) != (0, 1 % prime_power):
+            candidate = _brute_pisano(prime_power)
+        period = period * candidate // gcd(period, candidate)
+    return period
+
+
+# largest modulus fib_mod reduces n for: pisano_period factorizes m (and p - 1
+# or 2(p + 1) for its primes) by trial division, which is only cheap when
+# small, while doubling mod m is O(log n) whatever m is
+PISANO_LIMIT: int = 1 << 24
+
+
+def fib_mod(n: int, m: int) -> int:
+    """
+    F(n) mod m by doubling mod m, skipping ahead with the Pisano period first
+    when m is at most PISANO_LIMIT.
+    """
+    if n < 0:
+        raise ValueError("n must be non-negative: {}".format(n))
+    if m < 1:
+        raise ValueError("modulus must be positive: {}".format(m))
+    if m <= PISANO_LIMIT:
+        n %= pisano_period(m)
+    return fib_pair(n, m)[0] % m
+
+
+def _time_it(f: Callable[[int], int], n: int) -> float:
+    start = timeit.default_timer()
+    f(n)
+    return timeit.default_timer() - start
+
+
+def benchmark(
+    ns: List[int] = [10**e for e in range(3, 8)], linear_limit: int = 10**6
+) -> None:
+    """
+    Compare fib_doubling and fib_matrix against fib5 and the memoized fibonacci.
+    The linear ones are skipped above linear_limit since they need n big-int additions.
+    """
+    print(
+        "{:>10} {:>14} {:>14} {:>14} {:>14}".format(
+            "n", "doubling (s)", "matrix (s)", "fib5 (s)", "fibonacci (s)"
+        )
+    )
+    for n in ns:
+        fib_memo.clear()  # otherwise later calls are just a lookup
+        columns: List[str] = []
+        for f, limit in (
+            (fib_doubling, None),
+            (fib_matrix, None),
+            (fib5, linear_limit),
+            (fibonacci, linear_limit),
+        ):
+            if limit is not None and n > limit:
+                columns.append("skipped")
+                continue
+            columns.append("{:.6f}".format(_time_it(f, n)))
+        print("{:>10} {:>14} {:>14} {:>14} {:>14}".format(n, *columns))
+
+
+if __name__ == "__main__":
+    assert all(fib_doubling(n) == fib5(n) == fib_matrix(n) for n in range(100))
+    print(fib_doubling(50))
+    print("F(10^18) mod 10^9+7:", fib_mod(10**18, 10**9 + 7))
+    print("Pisano period of 10:", pisano_period(10))  # 60
+    # bits, since str() refuses ints of more than 4300 digits since Python 3.11
+    print("fib_doubling(10^6) has {} bits".format(fib_doubling(10**6).bit_length()))
+    benchmark()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from typing import Generator, Iterator, List, Optional, Tuple, Union
+
+from fib_fast import fib_pair
+
+
+def _advance(pair: Tuple[int, int], jump: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Move (F(n), F(n+1)) forward by k given jump = (F(k), F(k+1)):
+        F(n+k)   = F(n) * (F(k+1) - F(k)) + F(n+1) * F(k)
+        F(n+k+1) = F(n) * F(k) + F(n+1) * F(k+1)
+    For k == 1 this is the usual last, next = next, last + next.
+    """
+    fn, fn1 = pair
+    fk, fk1 = jump
+    return fn * (fk1 - fk) + fn1 * fk, fn * fk + fn1 * fk1
+
+
+class FibonacciStream:
+    """
+    Seekable view over F(start), F(start + step), ... (up to stop, exclusive).
+    Only the first term is computed by fast doubling, the rest continue by
+    additions, so reading indexes 5_000_000..5_010_000 doesn't pay for the
+    earlier ones.
+    """
+
+    def __init__(self, start: int = 0, stop: Optional[int] = None, step: int = 1):
+        if start < 0 or (stop is not None and stop < 0):
+            raise ValueError("Fibonacci indexes must be non-negative")
+        if step < 1:
+            raise ValueError("step must be positive: {}".format(step))
+        self.start: int = start
+        self.stop: Optional[int] = stop
+        self.step: int = step
+
+    def __len__(self) -> int:
+        if self.stop is None:
+            raise TypeError("unbounded FibonacciStream has no len()")
+        return len(range(self.start, self.stop, self.step))
+
+    def _index(self, i: int) -> int:
+        # translate a position in this stream to an absolute Fibonacci index
+        if i < 0:
+            if self.stop is None:
+                raise IndexError("negative index on an unbounded stream")
+            i += len(self)
+        if i < 0 or (self.stop is not None and i >= len(self)):
+            raise IndexError("FibonacciStream index out of range")
+        return self.start + i * self.step
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[int, FibonacciStream]:
+        if isinstance(key, slice):
+            if self.stop is None:
+                if (key.start or 0) < 0 or (key.stop is not None and key.stop < 0):
+                    raise ValueError("negative slice bounds on an unbounded stream")
+                start: int = key.start or 0
+                stop: Optional[int] = key.stop
+                step: int = key.step or 1
+            else:
+                start, stop, step = key.indices(len(self))
+            if step < 1:
+                raise ValueError("FibonacciStream only supports forward slices")
+            return FibonacciStream(
+                self.start + start * self.step,
+                None if stop is None else self.start + max(stop, start) * self.step,
+                self.step * step,
+            )
+        return fib_pair(self._index(key))[0]
+
+    def seek(self, index: int) -> FibonacciStream:
+        """Same stream restarted at absolute Fibonacci index `index`."""
+        return FibonacciStream(index, self.stop, self.step)
+
+    def __iter__(self) -> Iterator[int]:
+        for batch in self.batches(1):
+            yield batch[0]
+
+    def batches(self, size: int = 1024) -> Generator[List[int], None, None]:
+        """Yield lists of up to `size` terms, amortizing the per-item generator cost."""
+        if size < 1:
+            raise ValueError("batch size must be positive: {}".format(size))
+        remaining: Optional[int] = None if self.stop is None else len(self)
+        pair: Tuple[int, int] = fib_pair(self.start)
+        jump: Tuple[int, int] = fib_pair(self.step)
+        while remaining is None or remaining > 0:
+            count: int = size if remaining is None else min(size, remaining)
+            batch: List[int] = []
+            append = batch.append  # avoid the attribute lookup in the hot loop
+            if self.step == 1:
+                last, next = pair
+                for _ in range(count):
+                    append(last)
+                    last, next = next, last + next
+                pair = (last, next)
+            else:
+                for _ in range(count):
+                    append(pair[0])
+                    pair = _advance(pair, jump)
+            if remaining is not None:
+                remaining -= count
+            yield batch
+
+
+def fib_range(start: int, stop: Optional[int] = None, step: int = 1) -> FibonacciStream:
+    """islice-style shortcut: fib_range(a, b) gives F(a), ..., F(b - 1)."""
+    return FibonacciStream(start, stop, step)
+
+
+if __name__ == "__main__":
+    from fib6 import fib6
+
+    assert list(FibonacciStream(0, 51)) == list(fib6(50))
+    stream: FibonacciStream = FibonacciStream()
+    print(stream[50])  # 12586269025
+    print(list(stream[10:20]))
+    print(list(stream[10:30:5]))
+    window: FibonacciStream = fib_range(5_000_000, 5_010_000)
+    terms: int = sum(len(batch) for batch in window.batches(1000))
+    print("read {} terms starting at F(5_000_000)".format(terms))
@@ -0,0 +1,219 @@
+from __future__ import annotations
+from typing import BinaryIO, Generator, List, Optional
+import mmap
+import struct
+
+from trivial_compression import AmbiguousRun, pack_with_exceptions, unpack
+
+# container layout: magic, format version, number of bases, number of ambiguity
+# runs, then the packed bytes (ambiguity codes packed as A), then the runs
+MAGIC: bytes = b"2BG"
+VERSION: int = 2
+_HEADER: struct.Struct = struct.Struct(">3sBQQ")
+HEADER_SIZE: int = _HEADER.size
+_RUN: struct.Struct = struct.Struct(">QQc")  # start, length, symbol
+_WHITESPACE: bytes = b" \t\r\n"
+
+
+def _sequence_chunks(source: BinaryIO, chunk_size: int) -> Generator[bytes, None, None]:
+    """
+    Yield raw sequence bytes from a FASTA or plain sequence file.
+    Header lines (starting with '>') and whitespace are dropped; multiple
+    FASTA records are concatenated.
+    """
+    in_header: bool = False
+    at_line_start: bool = True
+    while True:
+        chunk: bytes = source.read(chunk_size)
+        if not chunk:
+            return
+        position: int = 0
+        while position < len(chunk):
+            if in_header:
+                newline: int = chunk.find(b"\n", position)
+                if newline == -1:
+                    position = len(chunk)  # header goes on in the next chunk
+                    break
+                position = newline + 1
+                in_header = False
+                at_line_start = True
+                continue
+            if at_line_start and chunk[position : position + 1] == b">":
+                in_header = True
+                continue
+            header: int = chunk.find(b"\n>", position)
+            end: int = len(chunk) if header == -1 else header + 1
+            sequence: bytes = chunk[position:end].translate(None, _WHITESPACE)
+            if sequence:
+                yield sequence
+            at_line_start = chunk[end - 1 : end] == b"\n"
+            position = end
+
+
+def compress_file(source_path: str, target_path: str, chunk_size: int = 1 << 20) -> int:
+    """
+    Stream a FASTA/raw sequence file into a 2 bit container file.
+    Ambiguity codes such as N are kept as runs, see CompressedGene; other
+    letters raise ValueError. Memory use is bounded by chunk_size plus the
+    list of runs, returns the number of bases written.
+    """
+    length: int = 0
+    carry: bytes = b""  # bases left over so every packed chunk is whole bytes
+    runs: List[AmbiguousRun] = []
+    with open(source_path, "rb") as source, open(target_path, "wb") as target:
+        # length and run count fixed up at the end
+        target.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        for sequence in _sequence_chunks(source, chunk_size):
+            sequence = carry + sequence
+            whole: int = len(sequence) - len(sequence) % 4
+            carry = sequence[whole:]
+            length = _write_packed(target, sequence[:whole], length, runs)
+        length = _write_packed(target, carry, length, runs)
+        for run in runs:
+            target.write(_RUN.pack(run.start, run.length, run.symbol.encode("ascii")))
+        target.seek(0)
+        target.write(_HEADER.pack(MAGIC, VERSION, length, len(runs)))
+    return length
+
+
+def _write_packed(
+    target: BinaryIO, sequence: bytes, offset: int, runs: List[AmbiguousRun]
+) -> int:
+    """Pack sequence, found at base offset, adding its ambiguity runs to runs."""
+    packed, found = pack_with_exceptions(sequence)
+    target.write(packed)
+    for run in found:
+        run = run._replace(start=run.start + offset)
+        last: Optional[AmbiguousRun] = runs[-1] if runs else None
+        if (
+            last is not None
+            and last.symbol == run.symbol
+            and last.start + last.length == run.start
+        ):  # one run going on over chunks
+            runs[-1] = last._replace(length=last.length + run.length)
+        else:
+            runs.append(run)
+    return offset + len(sequence)
+
+
+class GeneContainer:
+    """
+    Read side of the container, backed by mmap so the packed bases are
+    never copied as a whole: `packed` is a zero copy memoryview over the file.
+    The ambiguity runs are read into `exceptions` and patched back in chunks().
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file: BinaryIO = open(path, "rb")
+        try:
+            self._mmap: mmap.mmap = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+        except ValueError:  # empty files can't be mapped
+            self._file.close()
+            raise ValueError("Not a gene container: {}".format(path))
+        if len(self._mmap) < HEADER_SIZE:
+            self.close()
+            raise ValueError("Not a gene container: {}".format(path))
+        magic, version, length, run_count = _HEADER.unpack_from(self._mmap)
+        table: int = HEADER_SIZE + (length + 3) // 4
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or len(self._mmap) != table + run_count * _RUN.size
+        ):
+            self.close()
+            raise ValueError("Not a gene container: {}".format(path))
+        self.length: int = length
+        self.exceptions: List[AmbiguousRun] = [
+            AmbiguousRun(start, run_length, symbol.decode("ascii"))
+            for start, run_length, symbol in _RUN.iter_unpack(self._mmap[table:])
+        ]
+        self.packed: memoryview = memoryview(self._mmap)[HEADER_SIZE:table]
+
+    def __len__(self) -> int:
+        return self.length
+
+    def chunks(self, chunk_bases: int = 1 << 20) -> Generator[str, None, None]:
+        """Decompress lazily, chunk_bases at a time (rounded up to a multiple of 4)."""
+        chunk_bytes: int = max(1, (chunk_bases + 3) // 4)
+        remaining: int = self.length
+        run: int = 0  # first ambiguity run that may reach into this chunk
+        for start in range(0, len(self.packed), chunk_bytes):
+            piece: bytes = bytes(self.packed[start : start + chunk_bytes])
+            bases: int = min(remaining, len(piece) * 4)
+            remaining -= bases
+            chunk: str = unpack(piece, bases)
+            first: int = start * 4  # base index of chunk[0]
+            # patch the runs overlapping the chunk back in
+            pieces: List[str] = []
+            position: int = first
+            while run < len(self.exceptions):
+                ambiguous: AmbiguousRun = self.exceptions[run]
+                if ambiguous.start >= first + bases:
+                    break
+                low: int = max(ambiguous.start, first)
+                high: int = min(ambiguous.start + ambiguous.length, first + bases)
+                pieces.append(chunk[position - first : low - first])
+                pieces.append(ambiguous.symbol * (high - low))
+                position = high
+                if ambiguous.start + ambiguous.length > first + bases:
+                    break  # goes on in the next chunk
+                run += 1
+            if pieces:
+                pieces.append(chunk[position - first :])
+                chunk = "".join(pieces)
+            yield chunk
+
+    def close(self) -> None:
+        if getattr(self, "packed", None) is not None:
+            self.packed.release()
+            self.packed = None
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> GeneContainer:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def decompress_chunks(
+    path: str, chunk_bases: int = 1 << 20
+) -> Generator[str, None, None]:
+    with GeneContainer(path) as container:
+        yield from container.chunks(chunk_bases)
+
+
+def decompress_file(
+    source_path: str, target_path: str, chunk_bases: int = 1 << 20
+) -> None:
+    """Write the raw sequence back, without line breaks or FASTA headers."""
+    with open(target_path, "w") as target:
+        for chunk in decompress_chunks(source_path, chunk_bases):
+            target.write(chunk)
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    motif: str = "TAGGGATTAACCGTTATATATATATAGCCATGGATCGATTATA"
+    # a gap of unknown bases now and then, like in real assemblies
+    lines: List[str] = ["N" * 50 if i % 100 == 99 else motif for i in range(1000)]
+    with tempfile.TemporaryDirectory() as folder:
+        fasta_path: str = os.path.join(folder, "example.fa")
+        container_path: str = os.path.join(folder, "example.2bg")
+        with open(fasta_path, "w") as fasta:
+            fasta.write(">example sequence\n")
+            for line in lines:
+                fasta.write(line + "\n")
+        bases: int = compress_file(fasta_path, container_path, chunk_size=4096)
+        print(
+            "{} bases: fasta is {} bytes, container is {} bytes".format(
+                bases, os.path.getsize(fasta_path), os.path.getsize(container_path)
+            )
+        )
+        restored: str = "".join(decompress_chunks(container_path, chunk_bases=1000))
+        print("round trip is the same: {}".format(restored == "".join(lines)))
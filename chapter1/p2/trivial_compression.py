@@ -1,47 +1,422 @@
+from __future__ import annotations
+from typing import Dict, Iterator, List, NamedTuple, Optional, Pattern, Tuple, Union
+from array import array
+from bisect import bisect_right
+import re
+import timeit
+
+# nucleotide <-> 2 bit code, A=00, C=01, G=10, T=11
+NUCLEOTIDES: str = "ACGT"
+_INVALID: int = 0xFF
+# ascii byte -> 2 bit code (lower case accepted), anything else is _INVALID
+_ENCODE_TABLE: bytes = bytes(
+    NUCLEOTIDES.find(chr(c).upper()) if chr(c).upper() in NUCLEOTIDES else _INVALID
+    for c in range(256)
+)
+# 2 bit code -> same code shifted to its slot inside a byte (first base on the high bits)
+_SHIFT_TABLES: List[bytes] = [
+    bytes((c << shift) & 0xFF if c < 4 else 0 for c in range(256))
+    for shift in (6, 4, 2, 0)
+]
+# packed byte -> ascii nucleotide at each of the 4 slots
+_DECODE_TABLES: List[bytes] = [
+    bytes(ord(NUCLEOTIDES[(b >> shift) & 0b11]) for b in range(256))
+    for shift in (6, 4, 2, 0)
+]
+
+
+def pack(gene: Union[str, bytes]) -> bytearray:
+    """
+    Pack a nucleotide string (or its ascii bytes) into 4 bases per byte.
+    Everything runs in C: translate() maps letters to codes, extended slices
+    split the 4 slots, and one big-int OR merges them (slots never overlap).
+    """
+    raw: bytes = (
+        gene.encode("ascii", errors="replace") if isinstance(gene, str) else gene
+    )
+    codes: bytes = raw.translate(_ENCODE_TABLE)
+    bad: int = codes.find(_INVALID)
+    if bad != -1:
+        invalid: str = gene[bad] if isinstance(gene, str) else chr(gene[bad])
+        raise ValueError("Invalid Nucleotide:{}".format(invalid))
+    n_bytes: int = (len(codes) + 3) // 4
+    merged: int = 0
+    for slot in range(4):
+        lane: bytes = codes[slot::4].translate(_SHIFT_TABLES[slot])
+        lane += bytes(n_bytes - len(lane))  # pad the last byte with A (00)
+        merged |= int.from_bytes(lane, "big")
+    return bytearray(merged.to_bytes(n_bytes, "big"))
+
+
+def _unpack_bytes(packed: bytes, length: int) -> bytearray:
+    out: bytearray = bytearray(len(packed) * 4)
+    for slot in range(4):
+        out[slot::4] = packed.translate(_DECODE_TABLES[slot])
+    del out[length:]
+    return out
+
+
+def unpack(packed: bytes, length: int) -> str:
+    """Inverse of pack: decode each slot with a table and interleave with slices."""
+    return _unpack_bytes(packed, length).decode("ascii")
+
+
+# IUPAC ambiguity codes (and gaps) are kept aside instead of raising ValueError
+AMBIGUOUS: str = "NRYKMSWBDHV-"
+_AMBIGUOUS_RUN: Pattern[bytes] = re.compile(
+    rb"([" + re.escape(AMBIGUOUS.encode("ascii")) + rb"])\1*"
+)
+# ambiguity codes are stored as A in the packed buffer, the exception list has the truth
+_MASK_TABLE: bytes = bytes.maketrans(
+    (AMBIGUOUS + AMBIGUOUS.lower()).encode("ascii"),
+    b"A" * (2 * len(AMBIGUOUS)),
+)
+
+
+class AmbiguousRun(NamedTuple):
+    start: int
+    length: int
+    symbol: str
+
+
+def find_exceptions(gene: bytes) -> List[AmbiguousRun]:
+    """Runs of the same ambiguity code, e.g. NNNN -> AmbiguousRun(start, 4, "N")."""
+    return [
+        AmbiguousRun(match.start(), match.end() - match.start(), chr(match.group()[0]))
+        for match in _AMBIGUOUS_RUN.finditer(gene.upper())
+    ]
+
+
+def pack_with_exceptions(
+    gene: Union[str, bytes],
+) -> Tuple[bytearray, List[AmbiguousRun]]:
+    """
+    pack, with ambiguity codes packed as A and returned as runs instead of
+    raising ValueError; any other invalid letter still raises.
+    """
+    raw: bytes = (
+        gene.encode("ascii", errors="replace") if isinstance(gene, str) else gene
+    )
+    # deleting the valid letters is one cheap pass, the regex only runs if needed
+    found: List[AmbiguousRun] = (
+        find_exceptions(raw) if raw.translate(None, b"ACGTacgt") else []
+    )
+    if found:
+        raw = raw.translate(_MASK_TABLE)
+    return pack(raw if found else gene), found
+
+
+BLOCK_BYTES: int = 64  # 256 bases per dictionary block
+
+
+class _BlockStore:
+    """
+    Packed bytes stored as a dictionary of unique BLOCK_BYTES blocks plus one
+    block id per position, so repeated regions are only kept once. The last,
+    partial block stays in a plain tail. Indexing and slicing act like bytes.
+    """
+
+    def __init__(self, packed: bytes) -> None:
+        self._blocks: List[bytes] = []
+        self._block_index: Dict[bytes, int] = {}
+        self._block_ids: array = array("I")
+        self._tail: bytearray = bytearray()
+        self.extend(packed)
+
+    def _intern(self, block: bytes) -> None:
+        block_id: Optional[int] = self._block_index.get(block)
+        if block_id is None:
+            block_id = len(self._blocks)
+            self._blocks.append(block)
+            self._block_index[block] = block_id
+        self._block_ids.append(block_id)
+
+    def or_last(self, bits: int) -> None:
+        """OR bits into the last byte, moving it back to the tail if it is in a block."""
+        if not self._tail:
+            # blocks are shared, so the last one is copied before changing it
+            self._tail = bytearray(self._blocks[self._block_ids.pop()])
+        self._tail[-1] |= bits
+
+    def extend(self, packed: bytes) -> None:
+        self._tail += packed
+        whole: int = len(self._tail) - len(self._tail) % BLOCK_BYTES
+        for start in range(0, whole, BLOCK_BYTES):
+            self._intern(bytes(self._tail[start : start + BLOCK_BYTES]))
+        del self._tail[:whole]
+
+    def __len__(self) -> int:
+        return len(self._block_ids) * BLOCK_BYTES + len(self._tail)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[int, bytes]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("_BlockStore only supports contiguous slices")
+            pieces: List[bytes] = []
+            position: int = start
+            while position < stop:
+                block, offset = divmod(position, BLOCK_BYTES)
+                if block < len(self._block_ids):
+                    data: bytes = self._blocks[self._block_ids[block]]
+                else:
+                    data = self._tail
+                piece: bytes = data[offset : offset + stop - position]
+                pieces.append(piece)
+                position += len(piece)
+            return b"".join(pieces)
+        if key < 0:
+            key += len(self)
+        block, offset = divmod(key, BLOCK_BYTES)
+        if block < len(self._block_ids):
+            return self._blocks[self._block_ids[block]][offset]
+        return self._tail[offset]
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            len(self._blocks) * BLOCK_BYTES
+            + self._block_ids.itemsize * len(self._block_ids)
+            + len(self._tail)
+        )
+
+
 class CompressedGene:
-    def __init__(self, gene: str) -> None:
+    """
+    codec is "2bit" (plain packed buffer) or "blocks" (dictionary of repeated
+    BLOCK_BYTES blocks on top of the 2 bit packing). Ambiguity codes such as N
+    are recorded in an exception list either way.
+    """
+
+    CODECS: Tuple[str, ...] = ("2bit", "blocks")
+
+    def __init__(self, gene: str, codec: str = "2bit") -> None:
+        if codec not in self.CODECS:
+            raise ValueError("Invalid codec:{}".format(codec))
+        self.codec: str = codec
         self._compress(gene)
 
     def _compress(self, gene: str) -> None:
-        self.bit_string: int = 1  # start with sentinel
-        for nucleotide in gene.upper():
-            self.bit_string <<= 2  # shift left two bits
-            if nucleotide == "A":  # change last two bits to 00
-                self.bit_string |= 0b00
-            elif nucleotide == "C":  # change last two bits to 01
-                self.bit_string |= 0b01
-            elif nucleotide == "G":  # change last two bits to 10
-                self.bit_string |= 0b10
-            elif nucleotide == "T":  # change last two bits to 11
-                self.bit_string |= 0b11
+        self._packed: Union[bytearray, _BlockStore] = (
+            bytearray() if self.codec == "2bit" else _BlockStore(b"")
+        )
+        self._length: int = 0
+        self._exceptions: List[AmbiguousRun] = []
+        self._exception_starts: List[int] = []
+        self.extend(gene)
+
+    def _add_exception(self, ambiguous: AmbiguousRun) -> None:
+        if self._exceptions:
+            last: AmbiguousRun = self._exceptions[-1]
+            if (
+                last.symbol == ambiguous.symbol
+                and last.start + last.length == ambiguous.start
+            ):  # NN + NN is one run, not two
+                self._exceptions[-1] = last._replace(
+                    length=last.length + ambiguous.length
+                )
+                return
+        self._exceptions.append(ambiguous)
+        self._exception_starts.append(ambiguous.start)
+
+    def _extend_packed(self, packed: bytes, length: int) -> None:
+        """
+        Append `length` bases already packed from the high bits of packed[0].
+        Nothing stored before is re-encoded: at a byte boundary the bytes are
+        copied as they are, otherwise they are shifted once (one big-int shift)
+        to fill the free slots of the current last byte.
+        """
+        if length == 0:
+            return
+        offset: int = self._length & 3  # bases already in the last byte
+        needed: int = (self._length + length + 3) // 4 - len(self._packed)
+        if offset == 0:
+            tail: bytes = packed[:needed]
+        else:
+            n_bytes: int = (length + 3) // 4
+            shifted: bytes = (
+                int.from_bytes(packed[:n_bytes], "big") << (8 - 2 * offset)
+            ).to_bytes(n_bytes + 1, "big")
+            # the leading byte holds the bases that fit in the free low slots
+            if self.codec == "2bit":
+                self._packed[-1] |= shifted[0]
             else:
-                raise ValueError("Invalid Nucleotide:{}".format(nucleotide))
+                self._packed.or_last(shifted[0])
+            tail = shifted[1 : 1 + needed]
+        if self.codec == "2bit":
+            self._packed += tail
+        else:
+            self._packed.extend(tail)
+        self._length += length
 
-    def decompress(self) -> str:
-        gene: str = ""
-        for i in range(
-            0, self.bit_string.bit_length() - 1, 2
-        ):  # - 1 to exclude sentinel
-            # remember that bit shift occurs in the end of the string
-            bits: int = self.bit_string >> i & 0b11  # get just 2 relevant bits at right
-            if bits == 0b00:  # A
-                gene += "A"
-            elif bits == 0b01:  # C
-                gene += "C"
-            elif bits == 0b10:  # G
-                gene += "G"
-            elif bits == 0b11:  # T
-                gene += "T"
+    def append(self, nucleotide: str) -> None:
+        if len(nucleotide) != 1:
+            raise ValueError("Invalid Nucleotide:{}".format(nucleotide))
+        code: int = _ENCODE_TABLE[ord(nucleotide)] if nucleotide.isascii() else _INVALID
+        if code == _INVALID:  # ambiguity codes and errors go the long way
+            self.extend(nucleotide)
+            return
+        # single base fast path: no pack() call, just the right slot of one byte
+        shift: int = 6 - 2 * (self._length & 3)
+        if shift == 6:
+            if self.codec == "2bit":
+                self._packed.append(code << 6)
             else:
-                raise ValueError("Invalid bits:{}".format(bits))
-        return gene[
-            ::-1
-        ]  # [::-1] reverses string by slicing backward, it's necessary since we came from the right side
+                self._packed.extend(bytes((code << 6,)))
+        elif self.codec == "2bit":
+            self._packed[-1] |= code << shift
+        else:
+            self._packed.or_last(code << shift)
+        self._length += 1
+
+    def extend(self, gene: Union[str, CompressedGene]) -> None:
+        """Amortized O(k) in the number of new bases, the existing data is untouched."""
+        if isinstance(gene, CompressedGene):
+            # read gene before changing self, they can be the same object
+            runs: List[AmbiguousRun] = list(gene._exceptions)
+            packed: bytes = gene._packed[:]
+            length: int = gene._length
+            for ambiguous in runs:
+                self._add_exception(
+                    ambiguous._replace(start=ambiguous.start + self._length)
+                )
+            self._extend_packed(packed, length)
+            return
+        # 4 nucleotides per byte; pack first, so invalid input changes nothing
+        packed, found = pack_with_exceptions(gene)
+        for ambiguous in found:
+            self._add_exception(
+                ambiguous._replace(start=ambiguous.start + self._length)
+            )
+        self._extend_packed(packed, len(gene))
+
+    def copy(self) -> CompressedGene:
+        """Copy of the packed data, no decoding or re-encoding involved."""
+        duplicate: CompressedGene = CompressedGene("", self.codec)
+        duplicate.extend(self)
+        return duplicate
+
+    def __add__(self, other: CompressedGene) -> CompressedGene:
+        if not isinstance(other, CompressedGene):
+            return NotImplemented
+        result: CompressedGene = self.copy()
+        result.extend(other)
+        return result
+
+    def __iadd__(self, other: Union[str, CompressedGene]) -> CompressedGene:
+        self.extend(other)
+        return self
+
+    @property
+    def exceptions(self) -> List[AmbiguousRun]:
+        return list(self._exceptions)
+
+    @property
+    def nbytes(self) -> int:
+        """Payload size: packed bases plus 3 ints per exception run."""
+        packed: int = len(self._packed) if self.codec == "2bit" else self._packed.nbytes
+        return packed + 12 * len(self._exceptions)
+
+    @property
+    def bit_string(self) -> int:
+        """Original sentinel-prefixed int representation, built on demand."""
+        if self._exceptions:
+            raise ValueError("bit_string can't represent ambiguity codes")
+        padding: int = len(self._packed) * 4 - self._length
+        bits: int = int.from_bytes(self._packed[:], "big") >> (2 * padding)
+        return bits | (1 << (2 * self._length))  # put the sentinel back on top
+
+    def decompress(self) -> str:
+        return self._span(0, self._length)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _exception_at(self, index: int) -> Optional[str]:
+        run: int = bisect_right(self._exception_starts, index) - 1
+        if run < 0:
+            return None
+        ambiguous: AmbiguousRun = self._exceptions[run]
+        return ambiguous.symbol if index < ambiguous.start + ambiguous.length else None
+
+    def _base(self, index: int) -> str:
+        if self._exceptions:
+            symbol: Optional[str] = self._exception_at(index)
+            if symbol is not None:
+                return symbol
+        # byte index >> 2 holds the base, slot index & 3 counts from the high bits
+        byte: int = self._packed[index >> 2]
+        return NUCLEOTIDES[(byte >> (6 - 2 * (index & 3))) & 0b11]
+
+    def _span(self, start: int, stop: int) -> str:
+        # decode only the bytes covering [start, stop)
+        first_byte: int = start >> 2
+        covered: bytearray = _unpack_bytes(
+            self._packed[first_byte : (stop + 3) >> 2], stop - 4 * first_byte
+        )
+        del covered[: start - 4 * first_byte]
+        # patch the exception runs overlapping the span back in
+        run: int = max(0, bisect_right(self._exception_starts, start) - 1)
+        while run < len(self._exceptions) and self._exceptions[run].start < stop:
+            ambiguous: AmbiguousRun = self._exceptions[run]
+            low: int = max(ambiguous.start, start)
+            high: int = min(ambiguous.start + ambiguous.length, stop)
+            if low < high:
+                symbol: bytes = ambiguous.symbol.encode("ascii")
+                covered[low - start : high - start] = symbol * (high - low)
+            run += 1
+        return covered.decode("ascii")
+
+    def __getitem__(self, key: Union[int, slice]) -> str:
+        if isinstance(key, slice):
+            indexes: range = range(*key.indices(self._length))
+            if not indexes:
+                return ""
+            if indexes.step == 1:
+                return self._span(indexes.start, indexes.stop)
+            if abs(indexes.step) <= 4:  # dense enough to decode the whole span
+                low: int = min(indexes[0], indexes[-1])
+                high: int = max(indexes[0], indexes[-1]) + 1
+                span: str = self._span(low, high)
+                return span[indexes.start - low :: indexes.step]
+            return "".join(self._base(i) for i in indexes)
+        if key < 0:
+            key += self._length
+        if not 0 <= key < self._length:
+            raise IndexError("CompressedGene index out of range")
+        return self._base(key)
+
+    def __iter__(self) -> Iterator[str]:
+        chunk_bases: int = 1 << 16  # decode in pieces, never the whole gene
+        for start in range(0, self._length, chunk_bases):
+            yield from self._span(start, min(start + chunk_bases, self._length))
 
     def __str__(self) -> str:  # string representation for pretty printing
         return self.decompress()
 
 
+def compression_report(gene: str, codec: str) -> None:
+    """Print compression ratio and encode/decode throughput for one codec."""
+    start: float = timeit.default_timer()
+    compressed: CompressedGene = CompressedGene(gene, codec)
+    encoded: float = timeit.default_timer()
+    decompressed: str = compressed.decompress()
+    decoded: float = timeit.default_timer()
+    megabases: float = len(gene) / 1e6
+    print(
+        "{:>6}: {} -> {} bytes (ratio {:.1f}x), encode {:.1f} Mb/s, decode {:.1f} Mb/s, "
+        "round trip ok: {}".format(
+            codec,
+            len(gene),
+            compressed.nbytes,
+            len(gene) / max(1, compressed.nbytes),
+            megabases / max(encoded - start, 1e-9),
+            megabases / max(decoded - encoded, 1e-9),
+            decompressed == gene.upper(),
+        )
+    )
+
+
 if __name__ == "__main__":
     from sys import getsizeof
 
@@ -51,10 +426,25 @@ if __name__ == "__main__":
     )
     print("original is {} bytes".format(getsizeof(original)))
     compressed: CompressedGene = CompressedGene(original)  # compress
-    print("compressed is {} bytes".format(getsizeof(compressed.bit_string)))
+    print("compressed is {} bytes".format(compressed.nbytes))
     print(compressed)  # decompress
+    print(
+        "{} bases, bases 4 to 14: {}".format(len(compressed), compressed[4:14])
+    )  # random access, only decodes the bytes touched
     print(
         "original and decompressed are the same: {}".format(
             original == compressed.decompress()
         )
     )
+    streamed: CompressedGene = CompressedGene("")
+    for nucleotide in original:
+        streamed.append(nucleotide)  # amortized O(1), nothing is re-encoded
+    print(
+        "appended one by one is the same: {}".format(
+            (streamed + compressed).decompress() == original * 2
+        )
+    )
+    with_gaps: str = "NNNN" + original + "NNRY" + original
+    for codec in CompressedGene.CODECS:
+        compression_report(original * 100, codec)
+        compression_report(with_gaps * 50, codec)
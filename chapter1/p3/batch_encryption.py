@@ -0,0 +1,144 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from secrets import token_bytes
+from typing import List, NamedTuple, Optional, Sequence
+import timeit
+
+from unbreakable_encryption import decrypt, encrypt, xor_block
+
+POOL_SIZE: int = 1 << 20  # bytes of pad drawn per token_bytes call
+
+
+class KeyPool:
+    """
+    Pre-drawn one-time pad bytes handed out in slices, so thousands of small
+    messages share one token_bytes call. Every byte is given out only once.
+    """
+
+    def __init__(self, capacity: int = POOL_SIZE) -> None:
+        self.capacity: int = capacity
+        self._buffer: bytes = b""
+        self._position: int = 0
+
+    def take(self, n: int) -> bytes:
+        if self._position + n > len(self._buffer):
+            # whatever is left is thrown away rather than glued to new bytes
+            self._buffer = token_bytes(max(self.capacity, n))
+            self._position = 0
+        pad: bytes = self._buffer[self._position : self._position + n]
+        self._position += n
+        return pad
+
+
+class EncryptedBatch(NamedTuple):
+    """Message i is ciphertext[offsets[i]:offsets[i + 1]], with the same slice of pad."""
+
+    pad: bytes
+    ciphertext: bytes
+    offsets: List[int]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def key(self, i: int) -> bytes:
+        return self.pad[self.offsets[i] : self.offsets[i + 1]]
+
+    def encrypted(self, i: int) -> bytes:
+        return self.ciphertext[self.offsets[i] : self.offsets[i + 1]]
+
+
+def _offsets(chunks: Sequence[bytes]) -> List[int]:
+    offsets: List[int] = [0]
+    for chunk in chunks:
+        offsets.append(offsets[-1] + len(chunk))
+    return offsets
+
+
+def _encrypt_chunk(
+    messages: Sequence[str], pool: Optional[KeyPool] = None
+) -> EncryptedBatch:
+    encoded: List[bytes] = [message.encode() for message in messages]
+    plain: bytes = b"".join(encoded)
+    pad: bytes = pool.take(len(plain)) if pool is not None else token_bytes(len(plain))
+    # one XOR over the whole batch instead of one big-int conversion per message
+    return EncryptedBatch(pad, xor_block(plain, pad), _offsets(encoded))
+
+
+def _merge(batches: Sequence[EncryptedBatch]) -> EncryptedBatch:
+    offsets: List[int] = [0]
+    for batch in batches:
+        base: int = offsets[-1]
+        offsets.extend(base + offset for offset in batch.offsets[1:])
+    return EncryptedBatch(
+        b"".join(batch.pad for batch in batches),
+        b"".join(batch.ciphertext for batch in batches),
+        offsets,
+    )
+
+
+def encrypt_batch(
+    messages: Sequence[str],
+    pool: Optional[KeyPool] = None,
+    workers: Optional[int] = None,
+    chunk_messages: int = 50000,
+) -> EncryptedBatch:
+    """
+    Encrypt many messages against one pre-drawn pad. With workers, chunks of
+    chunk_messages are encrypted in a process pool (each worker draws its own
+    pad, so pool is ignored there) and stitched back in order.
+    """
+    if not workers or len(messages) <= chunk_messages:
+        return _encrypt_chunk(messages, pool)
+    chunks: List[Sequence[str]] = [
+        messages[start : start + chunk_messages]
+        for start in range(0, len(messages), chunk_messages)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return _merge(list(executor.map(_encrypt_chunk, chunks)))
+
+
+def decrypt_batch(batch: EncryptedBatch) -> List[str]:
+    plain: bytes = xor_block(batch.ciphertext, batch.pad)
+    return [
+        plain[batch.offsets[i] : batch.offsets[i + 1]].decode()
+        for i in range(len(batch))
+    ]
+
+
+def benchmark(n_messages: int = 200000, workers: int = 4) -> None:
+    """
+    Messages per second: encrypt() in a loop vs encrypt_batch, with and
+    without workers. Processes only pay off once pickling the chunks is
+    cheaper than the XOR work, i.e. for long messages or huge batches.
+    """
+    messages: List[str] = ["message number {}".format(i) for i in range(n_messages)]
+
+    def report(label: str, seconds: float) -> None:
+        print("{:>24}: {:>12,.0f} messages/s".format(label, n_messages / seconds))
+
+    start: float = timeit.default_timer()
+    for message in messages:
+        encrypt(message)
+    report("encrypt() loop", timeit.default_timer() - start)
+
+    start = timeit.default_timer()
+    encrypt_batch(messages, KeyPool())
+    report("encrypt_batch", timeit.default_timer() - start)
+
+    start = timeit.default_timer()
+    encrypt_batch(messages, workers=workers)
+    report("encrypt_batch, {} procs".format(workers), timeit.default_timer() - start)
+
+
+if __name__ == "__main__":
+    pool: KeyPool = KeyPool()
+    batch: EncryptedBatch = encrypt_batch(["One Time Pad!", "", "\0leading zero"], pool)
+    print(decrypt_batch(batch))
+    # each message can still go through the single message API
+    print(
+        decrypt(
+            int.from_bytes(batch.encrypted(0), "big"),
+            int.from_bytes(batch.key(0), "big"),
+        )
+    )
+    benchmark()
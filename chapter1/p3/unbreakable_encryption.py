@@ -1,5 +1,11 @@
 from secrets import token_bytes
-from typing import Tuple
+from typing import BinaryIO, Optional, Tuple, Union
+import mmap
+import os
+
+BLOCK_SIZE: int = 1 << 20  # 1 MiB per XOR step for the streaming API
+
+Buffer = Union[bytearray, memoryview, mmap.mmap]
 
 
 def random_key(length: int) -> int:
@@ -17,17 +23,128 @@ def encrypt(original: str) -> Tuple[int, int]:
     return dummy, encrypted
 
 
-def decrypt(encrypted: int, dummy: str):
+def decrypt(encrypted: int, dummy: int, length: Optional[int] = None) -> str:
+    """
+    length is the message size in bytes. Without it, the size comes from
+    bit_length and leading zero bytes of the message are lost.
+    """
     decrypted_int: int = encrypted ^ dummy  # XOR
-    decrypted_bytes: bytes = decrypted_int.to_bytes(
-        length=(decrypted_int.bit_length() + 7) // 8, byteorder="big"
-    )
+    if length is None:
+        length = (decrypted_int.bit_length() + 7) // 8
+    decrypted_bytes: bytes = decrypted_int.to_bytes(length=length, byteorder="big")
     decrypted_str: str = decrypted_bytes.decode()
     return decrypted_str
 
 
+def xor_block(data: bytes, key: bytes) -> bytes:
+    """XOR two equally sized blocks; the big-int round trip keeps the loop in C."""
+    mixed: int = int.from_bytes(data, "big") ^ int.from_bytes(key[: len(data)], "big")
+    return mixed.to_bytes(len(data), "big")
+
+
+def xor_inplace(buffer: Buffer, key: bytes, block_size: int = BLOCK_SIZE) -> None:
+    """
+    XOR a writable buffer (bytearray, memoryview or mmap) with key, one block
+    at a time, so only a block-sized temporary exists at any moment.
+    """
+    if len(key) < len(buffer):
+        raise ValueError(
+            "key is shorter than the data: {} < {}".format(len(key), len(buffer))
+        )
+    view: memoryview = memoryview(buffer)
+    key_view: memoryview = memoryview(key)
+    try:
+        for start in range(0, len(view), block_size):
+            stop: int = min(start + block_size, len(view))
+            view[start:stop] = xor_block(view[start:stop], key_view[start:stop])
+    finally:
+        view.release()
+        key_view.release()
+
+
+def _xor_streams(
+    source: BinaryIO, key: BinaryIO, target: BinaryIO, block_size: int
+) -> int:
+    written: int = 0
+    while True:
+        block: bytes = source.read(block_size)
+        if not block:
+            return written
+        key_block: bytes = key.read(len(block))
+        if len(key_block) < len(block):
+            raise ValueError("key file is shorter than the data")
+        target.write(xor_block(block, key_block))
+        written += len(block)
+
+
+def encrypt_file(
+    source_path: str, *, target_path: str, key_path: str, block_size: int = BLOCK_SIZE
+) -> int:
+    """
+    Stream source_path into target_path, drawing a fresh one-time pad of the
+    same size into key_path as we go. Memory stays at a few blocks.
+    target_path and key_path are keyword-only in both directions: mixing them
+    up would truncate the pad, the only way to get the data back.
+    """
+    with open(source_path, "rb") as source, open(target_path, "wb") as target, open(
+        key_path, "wb"
+    ) as key:
+        written: int = 0
+        while True:
+            block: bytes = source.read(block_size)
+            if not block:
+                return written
+            pad: bytes = token_bytes(len(block))
+            key.write(pad)
+            target.write(xor_block(block, pad))
+            written += len(block)
+
+
+def decrypt_file(
+    source_path: str, *, target_path: str, key_path: str, block_size: int = BLOCK_SIZE
+) -> int:
+    with open(source_path, "rb") as source, open(key_path, "rb") as key, open(
+        target_path, "wb"
+    ) as target:
+        return _xor_streams(source, key, target, block_size)
+
+
+def xor_file_inplace(path: str, key_path: str, block_size: int = BLOCK_SIZE) -> None:
+    """Encrypt or decrypt a file where it is, through mmap, without a second copy."""
+    if os.path.getsize(path) == 0:
+        return  # empty files can't be mapped and need no work
+    with open(path, "r+b") as data_file, open(key_path, "rb") as key_file:
+        with mmap.mmap(data_file.fileno(), 0) as data, mmap.mmap(
+            key_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as key:
+            xor_inplace(data, key, block_size)
+            data.flush()
+
+
 if __name__ == "__main__":
     s = "One Time Pad!"
     key1, key2 = encrypt(s)
     result: str = decrypt(key1, key2)
     print(f"to encript: '{s}'\ndecrypted: '{result}'")
+
+    # leading zero bytes survive when the length is given
+    zeros = "\0\0zeros"
+    key1, key2 = encrypt(zeros)
+    print(decrypt(key1, key2, len(zeros.encode())) == zeros)
+
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as folder:
+        plain_path = os.path.join(folder, "plain.bin")
+        with open(plain_path, "wb") as f:
+            f.write(os.urandom(3 * BLOCK_SIZE + 17))
+        encrypted_path = os.path.join(folder, "encrypted.bin")
+        key_path = os.path.join(folder, "key.bin")
+        decrypted_path = os.path.join(folder, "decrypted.bin")
+        encrypt_file(plain_path, target_path=encrypted_path, key_path=key_path)
+        decrypt_file(encrypted_path, target_path=decrypted_path, key_path=key_path)
+        with open(plain_path, "rb") as a, open(decrypted_path, "rb") as b:
+            print("file round trip is the same:", a.read() == b.read())
+        xor_file_inplace(encrypted_path, key_path)  # decrypts in place
+        with open(plain_path, "rb") as a, open(encrypted_path, "rb") as b:
+            print("in place round trip is the same:", a.read() == b.read())
@@ -0,0 +1,157 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor
+from decimal import Context, Decimal, MAX_EMAX, MAX_PREC, MIN_EMIN, localcontext
+from typing import List, NamedTuple, Optional, TextIO
+import math
+import timeit
+
+# The splitting works on Decimal integers: libmpdec multiplies huge numbers with
+# a number theoretic transform and prints them in linear time, which Python ints
+# don't (and ints also refuse to print more than 4300 digits by default).
+_EXACT: Context = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+C3_OVER_24: int = 640320**3 // 24
+DIGITS_PER_TERM: float = 14.181647462725477  # log10(640320^3 / (24 * 6 * 2 * 6))
+_GUARD_DIGITS: int = 10
+
+
+class Split(NamedTuple):
+    """P(a, b), Q(a, b), T(a, b) of the Chudnovsky series over terms [a, b)."""
+
+    p: Decimal
+    q: Decimal
+    t: Decimal
+
+
+def _split(a: int, b: int) -> Split:
+    if b - a == 1:
+        if a == 0:
+            p = q = Decimal(1)
+        else:
+            p = Decimal((6 * a - 5) * (2 * a - 1) * (6 * a - 1))
+            q = Decimal(a) * a * a * C3_OVER_24
+        t = p * (13591409 + 545140134 * a)
+        return Split(p, q, -t if a & 1 else t)
+    middle: int = (a + b) // 2
+    return _combine(_split(a, middle), _split(middle, b))
+
+
+def _combine(left: Split, right: Split) -> Split:
+    return Split(
+        left.p * right.p, left.q * right.q, right.q * left.t + left.p * right.t
+    )
+
+
+def split_range(a: int, b: int) -> Split:
+    """Binary splitting over [a, b) in exact arithmetic (workers run this)."""
+    with localcontext(_EXACT):
+        return _split(a, b)
+
+
+def combine_pair(left: Split, right: Split) -> Split:
+    with localcontext(_EXACT):
+        return _combine(left, right)
+
+
+def _parallel_split(terms: int, executor: Executor, workers: int) -> Split:
+    # a few leaves per worker keeps everyone busy while the tree narrows
+    n_leaves: int = min(terms, workers * 4)
+    bounds: List[int] = [terms * i // n_leaves for i in range(n_leaves + 1)]
+    level: List[Split] = list(executor.map(split_range, bounds[:-1], bounds[1:]))
+    # merge the subproducts level by level, each level spread across the pool
+    while len(level) > 1:
+        merged: List[Split] = list(executor.map(combine_pair, level[0::2], level[1::2]))
+        if len(level) % 2:
+            merged.append(level[-1])
+        level = merged
+    return level[0]
+
+
+def _inverse_sqrt(n: int, prec: int) -> Decimal:
+    """
+    1 / sqrt(n) by Newton's iteration, doubling the working precision each
+    step. Much faster than Decimal.sqrt at 10^5+ digits since every step is
+    just a few (transform based) multiplications.
+    """
+    with localcontext() as context:
+        context.Emax = MAX_EMAX
+        x: Decimal = Decimal(1 / math.sqrt(n))  # ~15 correct digits to start
+        correct: int = 15
+        while correct < prec:
+            correct = min(2 * correct, prec)
+            context.prec = correct + _GUARD_DIGITS
+            x = x + x * (1 - n * x * x) / 2
+        context.prec = prec
+        return +x
+
+
+def pi_digits(digits: int, workers: int = 1) -> str:
+    """
+    pi with `digits` decimals, e.g. pi_digits(5) == "3.14159", truncated rather
+    than rounded. workers > 1 spreads the split tree over a ProcessPoolExecutor.
+    """
+    if digits < 1:
+        raise ValueError("digits must be positive: {}".format(digits))
+    terms: int = int(digits / DIGITS_PER_TERM) + 2
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            split: Split = _parallel_split(terms, executor, workers)
+    else:
+        split = split_range(0, terms)
+    with localcontext() as context:
+        context.prec = digits + _GUARD_DIGITS
+        context.Emax = MAX_EMAX
+        # sqrt(10005) = 10005 / sqrt(10005)
+        sqrt_c: Decimal = 10005 * _inverse_sqrt(10005, context.prec)
+        pi: Decimal = (split.q * 426880 * sqrt_c) / split.t
+        return str(pi)[: digits + 2]  # "3." + digits
+
+
+def write_pi_digits(
+    target: TextIO,
+    digits: int,
+    workers: int = 1,
+    chunk: int = 1 << 16,
+    line_length: Optional[int] = None,
+) -> None:
+    """
+    Write pi to a text stream, chunk characters at a time. The digits only
+    exist once the final division is done, but they go out in pieces and
+    optionally wrapped every line_length digits for reference files.
+    """
+    text: str = pi_digits(digits, workers)
+    if line_length is None:
+        for start in range(0, len(text), chunk):
+            target.write(text[start : start + chunk])
+        return
+    target.write(text[:2] + "\n")
+    lines_per_chunk: int = max(1, chunk // line_length)
+    for start in range(2, len(text), line_length * lines_per_chunk):
+        block: str = text[start : start + line_length * lines_per_chunk]
+        target.write(
+            "".join(
+                block[i : i + line_length] + "\n"
+                for i in range(0, len(block), line_length)
+            )
+        )
+
+
+def benchmark(digits: int = 100000, worker_counts: List[int] = [1, 2, 4, 8]) -> None:
+    """Scaling of pi_digits with the number of worker processes."""
+    baseline: Optional[float] = None
+    reference: Optional[str] = None
+    for workers in worker_counts:
+        start: float = timeit.default_timer()
+        result: str = pi_digits(digits, workers)
+        taken: float = timeit.default_timer() - start
+        baseline = baseline or taken
+        reference = reference or result
+        print(
+            "{} digits, {} workers: {:.3f}s (speedup {:.2f}x, same digits: {})".format(
+                digits, workers, taken, baseline / taken, result == reference
+            )
+        )
+
+
+if __name__ == "__main__":
+    print(pi_digits(50))
+    benchmark()
@@ -1,31 +1,120 @@
-import timeit
-import matplotlib.pyplot as plt
+from __future__ import annotations
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional
+import math
+import sys
+
+if TYPE_CHECKING:
+    from benchmark import BenchmarkResult
 
 
 def calculate_pi(n_terms: int) -> float:
     denominator: float = 1.0
+    sign: float = 1.0  # flip instead of computing (-1) ** i every term
     pi: float = 0.0
-    for i in range(n_terms):
-        pi += (-1) ** i * (4 / denominator)
+    for _ in range(n_terms):
+        pi += sign * (4 / denominator)
         denominator += 2.0
+        sign = -sign
     return pi
 
 
-def check_complexity():
-    pis = []
-    ns = []
-    time = []
-    for n in range(0, 1000, 1):
-        ns.append(n)
-        start = timeit.default_timer()
-        pis.append(calculate_pi(n))
-        stop = timeit.default_timer()
-        time.append(stop - start)
-    plt.plot(ns, time)
-    plt.xlabel("number of terms"), plt.ylabel("Time taken (s)")
-    plt.show()
+def calculate_pi_numpy(n_terms: int, block_size: int = 1 << 20) -> float:
+    """
+    Same Leibniz sum, evaluated block_size terms at a time with NumPy.
+    Block sums are combined with fsum so the total stays accurate.
+    """
+    import numpy as np  # lazy, so the rest of the module runs without NumPy
+
+    block_sums = []
+    for start in range(0, n_terms, block_size):
+        k = np.arange(start, min(start + block_size, n_terms), dtype=np.float64)
+        signs = 1.0 - 2.0 * (k % 2)  # +1, -1, +1, ...
+        block_sums.append(float(np.sum(signs * 4.0 / (2.0 * k + 1.0))))
+    return math.fsum(block_sums)
+
+
+def calculate_pi_euler(tolerance: float = 1e-12, max_terms: int = 10000) -> float:
+    """
+    Euler transform of the Leibniz series: pi = 2 * sum k! / (2k + 1)!!.
+    Each term is less than half the previous one, so we get about one bit per
+    term (Leibniz needs ~1/tolerance terms), and the tail is below twice the
+    next term.
+    """
+    term: float = 2.0  # 2 * 0! / 1!!
+    pi: float = 0.0
+    for k in range(max_terms):
+        pi += term
+        term *= (k + 1) / (2 * k + 3)
+        if 2 * term < tolerance:
+            return pi
+    raise ArithmeticError("no convergence after {} terms".format(max_terms))
+
+
+def _arctan_inverse(x: int, tolerance: float) -> float:
+    # arctan(1/x) = 1/x - 1/(3x^3) + 1/(5x^5) - ...
+    power: float = 1.0 / x
+    x_squared: int = x * x
+    total: float = 0.0
+    n: int = 1
+    sign: float = 1.0
+    while power / n >= tolerance:
+        total += sign * power / n
+        power /= x_squared
+        n += 2
+        sign = -sign
+    return total
+
+
+def calculate_pi_machin(tolerance: float = 1e-15) -> float:
+    """Machin's formula pi = 16 arctan(1/5) - 4 arctan(1/239), summed to tolerance."""
+    # the arctan(1/5) series gets multiplied by 16, so it needs a tighter bound
+    return 16 * _arctan_inverse(5, tolerance / 32) - 4 * _arctan_inverse(
+        239, tolerance / 8
+    )
+
+
+PRECISION_METHODS: Dict[str, Callable[[float], float]] = {
+    "euler": calculate_pi_euler,
+    "machin": calculate_pi_machin,
+}
+
+
+def pi_to_tolerance(tolerance: float, method: str = "machin") -> float:
+    """Ask for an accuracy instead of a number of terms (floats stop near 1e-16)."""
+    if method not in PRECISION_METHODS:
+        raise ValueError("Invalid method:{}".format(method))
+    return PRECISION_METHODS[method](tolerance)
+
+
+def check_complexity(
+    ns: Iterable[int] = (1000, 3000, 10000, 30000, 100000),
+    repeat: int = 5,
+    plot_path: Optional[str] = None,
+    show: bool = False,
+) -> BenchmarkResult:
+    """
+    Time calculate_pi over ns; plots only when plot_path or show is given.
+    benchmark.py, at the repository root, has to be importable.
+    """
+    from benchmark import run_benchmark
+
+    result: BenchmarkResult = run_benchmark(calculate_pi, ns, repeat=repeat)
+    if plot_path is not None or show:
+        result.plot(plot_path, show)
+    return result
 
 
 if __name__ == "__main__":
+    # so we can access benchmark.py in the repository root, run from this folder
+    sys.path.insert(0, "../..")
     print(calculate_pi(1000000))
-    check_complexity()
+    print(calculate_pi_numpy(100000000))  # same series, 100x the terms
+    for method in PRECISION_METHODS:
+        for tolerance in (1e-6, 1e-12):
+            value: float = pi_to_tolerance(tolerance, method)
+            print(
+                "{:>6} to {}: {} (error {:.1e})".format(
+                    method, tolerance, value, abs(value - math.pi)
+                )
+            )
+    print(check_complexity(show="--plot" in sys.argv).report())
@@ -1,4 +1,5 @@
-from typing import TypeVar, Generic, List
+from itertools import islice
+from typing import TypeVar, Generic, Generator, List, NamedTuple, Tuple
 
 T = TypeVar("T")
 
@@ -29,10 +30,76 @@ def hanoi(begin: Stack[int], end: Stack[int], temp: Stack[int], disks: int) -> N
 
 
 def hanoi_minimum_steps(n: int) -> int:
-    if n == 1:
-        return 1
-    else:
-        return 2 * hanoi_minimum_steps(n - 1) + 1
+    # H(n) = 2 * H(n - 1) + 1 with H(1) = 1 solves to 2^n - 1, see below
+    return (1 << n) - 1
+
+
+class Move(NamedTuple):
+    disk: int  # 1 is the smallest disk
+    source: int
+    target: int
+
+
+def hanoi_moves(
+    disks: int, begin: int = 0, end: int = 2, temp: int = 1
+) -> Generator[Move, None, None]:
+    """
+    Same moves as hanoi(), streamed in O(1) memory with the binary counter
+    method: move m moves disk (trailing zeros of m) + 1, from peg
+    (m & (m - 1)) % 3 to peg ((m | (m - 1)) + 1) % 3. That sends the tower
+    from 0 to 2 for an odd number of disks and from 0 to 1 for an even one,
+    so the last two pegs are swapped for even counts.
+    """
+    pegs: Tuple[int, int, int] = (begin, temp, end) if disks % 2 else (begin, end, temp)
+    for m in range(1, 1 << disks):
+        disk: int = (m & -m).bit_length()  # lowest set bit, 1-based
+        yield Move(disk, pegs[(m & (m - 1)) % 3], pegs[((m | (m - 1)) + 1) % 3])
+
+
+def hanoi_kth_move(
+    disks: int, k: int, begin: int = 0, end: int = 2, temp: int = 1
+) -> Move:
+    """
+    The k-th move (1-based) of the optimal solution, in O(disks) steps.
+    H(d, s -> t) is H(d - 1, s -> a), disk d s -> t, H(d - 1, a -> t), so
+    comparing k with 2^(d - 1) tells which of the three parts holds the move.
+    """
+    if not 1 <= k <= hanoi_minimum_steps(disks):
+        raise ValueError("move {} out of range for {} disks".format(k, disks))
+    source, target, spare = begin, end, temp
+    for disk in range(disks, 0, -1):
+        half: int = 1 << (disk - 1)
+        if k == half:
+            return Move(disk, source, target)
+        if k < half:
+            target, spare = spare, target  # inside the first H(d - 1)
+        else:
+            k -= half  # inside the second H(d - 1)
+            source, spare = spare, source
+    raise AssertionError("unreachable")
+
+
+def hanoi_configuration(
+    disks: int, k: int, begin: int = 0, end: int = 2, temp: int = 1
+) -> List[List[int]]:
+    """
+    Pegs after the first k moves, without simulating them: each peg lists its
+    disks from bottom to top (largest first). O(disks) steps.
+    """
+    if not 0 <= k <= hanoi_minimum_steps(disks):
+        raise ValueError("move {} out of range for {} disks".format(k, disks))
+    pegs: List[List[int]] = [[], [], []]
+    source, target, spare = begin, end, temp
+    for disk in range(disks, 0, -1):
+        half: int = 1 << (disk - 1)
+        if k < half:  # disk hasn't moved yet, smaller ones go to spare
+            pegs[source].append(disk)
+            target, spare = spare, target
+        else:  # disk is already on target, smaller ones come back from spare
+            pegs[target].append(disk)
+            k -= half
+            source, spare = spare, source
+    return pegs
 
 
 if __name__ == "__main__":
@@ -46,8 +113,14 @@ if __name__ == "__main__":
     hanoi(tower_a, tower_c, tower_b, num_discs)
     print("towers later: ", tower_a, tower_b, tower_c)
 
-    # arbitrary limit since 64 explodes calculations
     # exact solution is: 2^(n-1)*H(1) + (1 + 2^1 + 2^2 + ... + 2^(n-2))
     # which is:  2^(n-1)*H(1) + 2^(n-1) - 1 = 2^(n-1) * (H(1) + 1) - 1 = 2^n - 1
-    if num_discs <= 20:
-        print("minimum moves: ", hanoi_minimum_steps(num_discs))
+    print("minimum moves: ", hanoi_minimum_steps(num_discs))
+
+    # 64 disks can't be simulated, but any move or position can be queried
+    legend_moves: int = hanoi_minimum_steps(64)
+    print("moves for 64 disks: ", legend_moves)
+    print("move 2^63: ", hanoi_kth_move(64, 1 << 63))
+    print("last move: ", hanoi_kth_move(64, legend_moves))
+    print("pegs halfway: ", [len(peg) for peg in hanoi_configuration(64, 1 << 63)])
+    print("first moves for 64 disks: ", list(islice(hanoi_moves(64), 4)))
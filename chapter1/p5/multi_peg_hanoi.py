@@ -0,0 +1,149 @@
+from __future__ import annotations
+from typing import Dict, Generator, List, Tuple
+
+from hanoi import Move, hanoi_minimum_steps
+
+
+class FrameStewart:
+    """
+    Memoized Frame-Stewart table: moves(n, p) is the least number of moves
+    for n disks on p pegs under the Frame-Stewart strategy (optimal for p = 3
+    and p = 4), and split(n, p) the k that achieves it:
+        FS(n, p) = min over 1 <= k < n of 2 * FS(k, p) + FS(n - k, p - 1)
+    Tables are filled bottom-up, so there's no recursion even for large n.
+    """
+
+    def __init__(self) -> None:
+        self._moves: Dict[int, List[int]] = {}
+        self._splits: Dict[int, List[int]] = {}
+
+    def _fill(self, n: int, pegs: int) -> None:
+        if n < 0:
+            raise ValueError("n must be non-negative: {}".format(n))
+        if pegs < 3:
+            raise ValueError("need at least 3 pegs: {}".format(pegs))
+        moves: List[int] = self._moves.setdefault(pegs, [0, 1])
+        splits: List[int] = self._splits.setdefault(pegs, [0, 0])
+        if len(moves) > n:
+            return
+        if pegs > 3:
+            self._fill(n, pegs - 1)  # pegs - 3 levels at most
+            fewer: List[int] = self._moves[pegs - 1]
+        for m in range(len(moves), n + 1):
+            if pegs == 3:
+                moves.append(hanoi_minimum_steps(m))
+                splits.append(m - 1)
+                continue
+            # the best k never decreases with m, so start from the previous one
+            best_k: int = max(1, splits[m - 1])
+            best: int = 2 * moves[best_k] + fewer[m - best_k]
+            for k in range(best_k + 1, m):
+                candidate: int = 2 * moves[k] + fewer[m - k]
+                if candidate > best:
+                    break  # the cost is convex in k, past the minimum it only grows
+                if candidate < best:
+                    best, best_k = candidate, k
+            moves.append(best)
+            splits.append(best_k)
+
+    def moves(self, n: int, pegs: int) -> int:
+        self._fill(n, pegs)
+        return self._moves[pegs][n]
+
+    def split(self, n: int, pegs: int) -> int:
+        self._fill(n, pegs)
+        return self._splits[pegs][n]
+
+
+_table: FrameStewart = FrameStewart()
+
+
+def frame_stewart_moves(n: int, pegs: int) -> int:
+    return _table.moves(n, pegs)
+
+
+def multi_peg_hanoi(
+    n: int, pegs: int, table: FrameStewart = _table
+) -> Generator[Move, None, None]:
+    """
+    Stream Frame-Stewart moves taking n disks from peg 0 to peg pegs - 1.
+    An explicit stack replaces recursion: it holds at most a few pending
+    subproblems per level, so memory is O(n * pegs) whatever the move count.
+    """
+    table.moves(n, pegs)  # fill (and validate) the tables up front
+    # (disks, smallest disk number - 1, source, target, pegs allowed)
+    Task = Tuple[int, int, int, int, Tuple[int, ...]]
+    stack: List[Task] = [(n, 0, 0, pegs - 1, tuple(range(pegs)))]
+    while stack:
+        disks, offset, source, target, allowed = stack.pop()
+        if disks == 0:
+            continue
+        if disks == 1:
+            yield Move(offset + 1, source, target)
+            continue
+        k: int = table.split(disks, len(allowed))
+        spare: int = next(peg for peg in allowed if peg != source and peg != target)
+        without_spare: Tuple[int, ...] = tuple(p for p in allowed if p != spare)
+        # pushed in reverse: k small disks to spare, the rest over, k back on top
+        stack.append((k, offset, spare, target, allowed))
+        stack.append((disks - k, offset + k, source, target, without_spare))
+        stack.append((k, offset, source, spare, allowed))
+
+
+class BitboardTowers:
+    """
+    Tower state as one int per peg, bit i set when disk i + 1 is on it.
+    The top disk of a peg is its lowest set bit, so a move is a few bit
+    operations instead of list pops and pushes.
+    """
+
+    def __init__(self, n: int, pegs: int, start: int = 0) -> None:
+        self.boards: List[int] = [0] * pegs
+        self.boards[start] = (1 << n) - 1
+
+    def top(self, peg: int) -> int:
+        """Disk number on top of peg, 0 if empty."""
+        board: int = self.boards[peg]
+        return (board & -board).bit_length()
+
+    def move(self, move: Move) -> None:
+        disk_bit: int = 1 << (move.disk - 1)
+        source: int = self.boards[move.source]
+        target: int = self.boards[move.target]
+        if source & -source != disk_bit:
+            raise ValueError(
+                "disk {} is not on top of peg {}".format(move.disk, move.source)
+            )
+        if target and target & -target < disk_bit:
+            raise ValueError("disk {} can't go over a smaller disk".format(move.disk))
+        self.boards[move.source] = source ^ disk_bit
+        self.boards[move.target] = target | disk_bit
+
+    def disks(self, peg: int) -> List[int]:
+        """Disks on peg from bottom to top (largest first)."""
+        board: int = self.boards[peg]
+        return [i + 1 for i in range(board.bit_length() - 1, -1, -1) if board >> i & 1]
+
+    def __repr__(self) -> str:
+        return repr([self.disks(peg) for peg in range(len(self.boards))])
+
+
+if __name__ == "__main__":
+    for pegs in (3, 4, 5):
+        counts: List[int] = [frame_stewart_moves(n, pegs) for n in range(1, 11)]
+        print("{} pegs: {}".format(pegs, counts))
+    print("500 disks on 4 pegs: ", frame_stewart_moves(500, 4))
+    print("300 disks on 6 pegs: ", frame_stewart_moves(300, 6))
+
+    n, pegs = 30, 4
+    towers: BitboardTowers = BitboardTowers(n, pegs)
+    count: int = 0
+    for move in multi_peg_hanoi(n, pegs):
+        towers.move(move)  # raises on any illegal move
+        count += 1
+    print(
+        "{} disks on {} pegs: {} legal moves streamed (expected {})".format(
+            n, pegs, count, frame_stewart_moves(n, pegs)
+        )
+    )
+    print("solved: ", towers.disks(pegs - 1) == list(range(n, 0, -1)))
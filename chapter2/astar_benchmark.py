@@ -0,0 +1,139 @@
+import random
+import sys
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from generic_search import (
+    ArenaNode,
+    NodeArena,
+    PriorityQueue,
+    astar,
+    anytime_astar,
+    bfs,
+    bidirectional_astar,
+    bidirectional_bfs,
+    node_to_path,
+)
+from p2_maze import Maze, MazeLocation, manhattan_distance
+
+T = TypeVar("T")
+
+MAZE_SIZES: List[int] = [50, 100, 200]
+SPARSENESS: float = 0.2
+
+
+def solvable_maze(size: int) -> Maze:
+    while True:
+        maze: Maze = Maze(
+            size, size, SPARSENESS, MazeLocation(0, 0), MazeLocation(size - 1, size - 1)
+        )
+        if bfs(maze.start, maze.goal_test, maze.successors)[0] is not None:
+            return maze
+
+
+def previous_astar(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    heuristic: Callable[[T], float],
+) -> Optional[ArenaNode[T]]:
+    """
+    astar as it was before step costs, weights and stale-entry skipping, kept
+    as the baseline: unit costs, (f, index) heap entries, no closed set, so
+    an entry superseded by a cheaper path is still expanded when popped.
+    """
+    arena: NodeArena[T] = NodeArena(weighted=True)
+    frontier: PriorityQueue[Tuple[float, int]] = PriorityQueue()
+    initial_heuristic: float = heuristic(initial)
+    frontier.push((initial_heuristic, arena.add(initial, -1, 0.0, initial_heuristic)))
+    explored: Dict[T, float] = {initial: 0.0}
+    visited_states: int = 0
+    while not frontier.empty:
+        current_index: int = frontier.pop()[1]
+        visited_states += 1
+        current_state: T = arena.states[current_index]
+        if goal_test(current_state):
+            return (arena.node(current_index), visited_states)
+        for child in successors(current_state):
+            new_cost: float = arena.costs[current_index] + 1
+            if child not in explored or explored[child] > new_cost:
+                explored[child] = new_cost
+                child_heuristic: float = heuristic(child)
+                child_index: int = arena.add(
+                    child, current_index, new_cost, child_heuristic
+                )
+                frontier.push((new_cost + child_heuristic, child_index))
+    return (None, None)
+
+
+def strategies() -> Dict[str, Callable[[Maze], Tuple[int, int]]]:
+    """Each strategy returns (path length, states expanded)."""
+
+    def run_astar(weight: float) -> Callable[[Maze], Tuple[int, int]]:
+        def run(maze: Maze) -> Tuple[int, int]:
+            node, expanded = astar(
+                maze.start,
+                maze.goal_test,
+                maze.successors,
+                manhattan_distance(maze.goal),
+                weight=weight,
+            )
+            return len(node_to_path(node)), expanded
+
+        return run
+
+    def run_anytime(maze: Maze) -> Tuple[int, int]:
+        *_, (node, expanded, _) = anytime_astar(
+            maze.start, maze.goal_test, maze.successors, manhattan_distance(maze.goal)
+        )
+        return len(node_to_path(node)), expanded
+
+    def run_previous_astar(maze: Maze) -> Tuple[int, int]:
+        node, expanded = previous_astar(
+            maze.start, maze.goal_test, maze.successors, manhattan_distance(maze.goal)
+        )
+        return len(node_to_path(node)), expanded
+
+    def run_bfs(maze: Maze) -> Tuple[int, int]:
+        node, expanded = bfs(maze.start, maze.goal_test, maze.successors)
+        return len(node_to_path(node)), expanded
+
+    def run_bidirectional_bfs(maze: Maze) -> Tuple[int, int]:
+        node, expanded = bidirectional_bfs(maze.start, maze.goal, maze.successors)
+        return len(node_to_path(node)), expanded
+
+    def run_bidirectional_astar(maze: Maze) -> Tuple[int, int]:
+        node, expanded = bidirectional_astar(
+            maze.start,
+            maze.goal,
+            maze.successors,
+            manhattan_distance(maze.goal),
+            manhattan_distance(maze.start),
+        )
+        return len(node_to_path(node)), expanded
+
+    return {
+        "bfs": run_bfs,
+        "bidirectional bfs": run_bidirectional_bfs,
+        "bidirectional astar": run_bidirectional_astar,
+        "astar before cost/stale-entry changes": run_previous_astar,
+        "astar": run_astar(1.0),
+        "weighted astar 1.5": run_astar(1.5),
+        "weighted astar 3": run_astar(3.0),
+        "anytime astar (all rounds)": run_anytime,
+    }
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, "..")  # so we can access benchmark.py in the parent directory
+    from benchmark import run_benchmark
+
+    random.seed(42)
+    mazes: Dict[int, Maze] = {size: solvable_maze(size) for size in MAZE_SIZES}
+    for name, strategy in strategies().items():
+        print("-" * 60 + "\n" + name)
+        for size, maze in mazes.items():
+            print("maze {0}x{0}: path {1}, expanded {2}".format(size, *strategy(maze)))
+        result = run_benchmark(
+            strategy, MAZE_SIZES, arguments=lambda n: (mazes[n],), repeat=3, name=name
+        )
+        print(result.report())
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from typing import List, Optional
-from generic_search import bfs, Node, node_to_path
+from generic_search import bfs, idastar, Node, node_to_path
 
 MISSIONARIES: int = 11
 CANNIBALS: int = 10
@@ -75,6 +75,19 @@ class MCState:
         return [x for x in successors if x.is_legal]
 
 
+def crossings_left(state: MCState) -> float:
+    """
+    Admissible idastar heuristic: every round trip takes at most one person
+    across for good (two go, one rows back), and the last trip takes two.
+    """
+    people: int = state.wm + state.wc
+    if not state.boat:  # someone has to row back first, if anyone is left
+        if people == 0:
+            return 0
+        return 1 + crossings_left(MCState(state.wm + 1, state.wc, True))
+    return 1 if people <= 2 else 2 * (people - 2) + 1
+
+
 def display_solution(path: List[MCState]):
     if len(path) == 0:  # sanity check
         return
@@ -109,3 +122,10 @@ if __name__ == "__main__":
         display_solution(path)
 
     print("visited_states: ", visited_states)
+
+    # same puzzle with memory linear in the path length instead of the space
+    solution, visited_states = idastar(
+        start, MCState.goal_test, MCState.successors, crossings_left, table_size=4096
+    )
+    print("IDA* path length: ", len(node_to_path(solution)) if solution else None)
+    print("IDA* visited_states: ", visited_states)
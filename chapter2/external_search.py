@@ -0,0 +1,277 @@
+from __future__ import annotations
+from heapq import merge
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+import os
+import pickle
+import random
+import struct
+import tempfile
+
+from generic_search import Node, SearchStats, bfs, node_to_path
+from p2_maze import Maze, MazeLocation
+from exercise_3 import MCState, MISSIONARIES, CANNIBALS
+
+T = TypeVar("T")
+
+# a record is a serialized state and the serialized state it was reached from
+Record = Tuple[bytes, bytes]
+_LENGTHS: struct.Struct = struct.Struct(">II")
+# most files merged at once, so open files stay well under ulimit -n
+FAN_IN: int = 64
+
+
+def _write_records(path: str, records: Iterable[Record]) -> int:
+    count: int = 0
+    with open(path, "wb") as f:
+        for state, parent in records:
+            f.write(_LENGTHS.pack(len(state), len(parent)))
+            f.write(state)
+            f.write(parent)
+            count += 1
+    return count
+
+
+def _read_records(path: str) -> Iterator[Record]:
+    with open(path, "rb") as f:
+        while True:
+            header: bytes = f.read(_LENGTHS.size)
+            if not header:
+                return
+            state_length, parent_length = _LENGTHS.unpack(header)
+            yield f.read(state_length), f.read(parent_length)
+
+
+def _unique(records: Iterable[Record]) -> Iterator[Record]:
+    """Drop repeated states from a stream sorted by state, keeping the first."""
+    previous: Optional[bytes] = None
+    for record in records:
+        if record[0] != previous:
+            previous = record[0]
+            yield record
+
+
+def _unique_keys(records: Iterable[Record]) -> Iterator[bytes]:
+    return (state for state, _ in records)
+
+
+def _subtract(records: Iterable[Record], seen: Iterable[bytes]) -> Iterator[Record]:
+    """Records whose state isn't in seen; both streams sorted by state."""
+    seen = iter(seen)
+    current: Optional[bytes] = next(seen, None)
+    for record in records:
+        while current is not None and current < record[0]:
+            current = next(seen, None)
+        if record[0] != current:
+            yield record
+
+
+class _LayerWriter:
+    """
+    Collects the children of one layer, sorting them into run files of at
+    most memory_records records, then merges the runs into the layer file,
+    FAN_IN runs at a time.
+    """
+
+    def __init__(self, directory: str, depth: int, memory_records: int) -> None:
+        self.directory: str = directory
+        self.depth: int = depth
+        self.memory_records: int = memory_records
+        self.buffer: List[Record] = []
+        self.runs: List[str] = []
+        self.run_count: int = 0
+        self.generated: int = 0
+
+    def add(self, state: bytes, parent: bytes) -> None:
+        self.buffer.append((state, parent))
+        self.generated += 1
+        if len(self.buffer) >= self.memory_records:
+            self._spill()
+
+    def _run_path(self) -> str:
+        self.run_count += 1
+        return os.path.join(
+            self.directory, "run-{}-{}.bin".format(self.depth, self.run_count)
+        )
+
+    def _spill(self) -> None:
+        self.buffer.sort()
+        path: str = self._run_path()
+        _write_records(path, _unique(self.buffer))
+        self.runs.append(path)
+        self.buffer = []
+
+    def _merge_runs(self) -> None:
+        """One pass merging every FAN_IN runs into one."""
+        merged: List[str] = []
+        for start in range(0, len(self.runs), FAN_IN):
+            group: List[str] = self.runs[start : start + FAN_IN]
+            path: str = self._run_path()
+            _write_records(path, _unique(merge(*(_read_records(r) for r in group))))
+            for run in group:
+                os.remove(run)
+            merged.append(path)
+        self.runs = merged
+
+    def finish(self, previous_layers: List[str]) -> Tuple[str, int]:
+        """Merge the runs, minus states of previous_layers, into the layer file."""
+        if self.buffer:
+            self._spill()
+        while len(self.runs) > FAN_IN:
+            self._merge_runs()
+        merged: Iterator[Record] = _unique(
+            merge(*(_read_records(run) for run in self.runs))
+        )
+        seen: Iterator[bytes] = _unique_keys(
+            merge(*(_read_records(layer) for layer in previous_layers))
+        )
+        path: str = os.path.join(self.directory, "layer-{}.bin".format(self.depth))
+        count: int = _write_records(path, _subtract(merged, seen))
+        for run in self.runs:
+            os.remove(run)
+        return path, count
+
+
+def _add_layer(directory: str, depth: int, visited: str, layer: str) -> str:
+    """Merge the states of a new layer into a copy of the visited file."""
+    path: str = os.path.join(directory, "visited-{}.bin".format(depth))
+    states: Iterator[bytes] = _unique_keys(
+        merge(_read_records(visited), _read_records(layer))
+    )
+    _write_records(path, ((state, b"") for state in states))
+    return path
+
+
+def _trace_back(layers: List[str], depth: int, parent: bytes) -> List[bytes]:
+    """Serialized states from the root down to the parent given, layer by layer."""
+    path: List[bytes] = []
+    while depth > 0:
+        depth -= 1
+        # layers are sorted, so stop scanning once past the parent
+        for state, grandparent in _read_records(layers[depth]):
+            if state >= parent:
+                break
+        path.append(parent)
+        parent = grandparent
+    path.reverse()
+    return path
+
+
+def external_bfs(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    encode: Callable[[T], bytes] = pickle.dumps,
+    decode: Callable[[bytes], T] = pickle.loads,
+    memory_records: int = 100000,
+    undirected: bool = False,
+    directory: Optional[str] = None,
+    stats: Optional[SearchStats[T]] = None,
+) -> Optional[Node[T]]:
+    """
+    Breadth-first search with its explored set on disk. Each layer is a file
+    of (state, parent) records sorted by serialized state: children are
+    sorted into runs of at most memory_records records, and the runs are
+    merged, deduplicated and stripped of states from earlier layers in one
+    streaming pass (delayed duplicate detection). Earlier layers are read
+    from one sorted file of every visited state, which each new layer is
+    merged into. Memory stays around memory_records records plus one record
+    per open file, and at most FAN_IN + 1 files are read at once.
+
+    encode must be canonical (equal states give equal bytes); pickle is for
+    tuples and NamedTuples such as MazeLocation. undirected=True only checks
+    the two previous layers, which is enough when every move can be undone
+    (Maze, MCState). The path is rebuilt from the parent fields of the
+    layer files; layers go in directory, or in a temporary one that is
+    removed afterwards. The path is a shortest one, though not necessarily
+    the one bfs returns, since layers are expanded in byte order.
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory() as temporary:
+            return external_bfs(
+                initial,
+                goal_test,
+                successors,
+                encode,
+                decode,
+                memory_records,
+                undirected,
+                temporary,
+                stats,
+            )
+    layers: List[str] = [os.path.join(directory, "layer-0.bin")]
+    _write_records(layers[0], [(encode(initial), b"")])
+    # every state seen so far, sorted; not needed when moves can be undone
+    visited: str = layers[0]
+    visited_states: int = 0
+
+    while True:
+        depth: int = len(layers)
+        writer: _LayerWriter = _LayerWriter(directory, depth, memory_records)
+        for state_bytes, parent_bytes in _read_records(layers[-1]):
+            state: T = decode(state_bytes)
+            visited_states += 1
+            if goal_test(state):
+                if stats is not None:
+                    stats.expanded_node(state, 0, 0, writer.generated)
+                path: List[bytes] = _trace_back(layers, depth - 1, parent_bytes)
+                node: Optional[Node[T]] = None
+                for cost, step in enumerate(path + [state_bytes]):
+                    node = Node(decode(step), node, float(cost))
+                return (node, visited_states)
+            children: List[T] = successors(state)
+            for child in children:
+                writer.add(encode(child), state_bytes)
+            if stats is not None:
+                stats.expanded_node(state, len(children), 0, writer.generated)
+        # the new layer can only repeat the last two when moves are reversible
+        previous: List[str] = layers[-2:] if undirected else [visited]
+        layer, count = writer.finish(previous)
+        if stats is not None:
+            stats.duplicates += writer.generated - count
+        if count == 0:
+            return (None, None)  # went through everything and never found goal
+        layers.append(layer)
+        if not undirected:
+            merged: str = _add_layer(directory, depth, visited, layer)
+            if visited != layers[0]:
+                os.remove(visited)
+            visited = merged
+
+
+def encode_mc(state: MCState) -> bytes:
+    return struct.pack(">II?", state.wm, state.wc, state.boat)
+
+
+def decode_mc(data: bytes) -> MCState:
+    return MCState(*struct.unpack(">II?", data))
+
+
+if __name__ == "__main__":
+    random.seed(1)
+    m: Maze = Maze(100, 100, 0.1, MazeLocation(0, 0), MazeLocation(99, 99))
+    reference, states = bfs(m.start, m.goal_test, m.successors)
+    solution, visited = external_bfs(
+        m.start, m.goal_test, m.successors, memory_records=1000, undirected=True
+    )
+    print(
+        "maze: bfs path {} ({} states), external path {} ({} states)".format(
+            reference and len(node_to_path(reference)),
+            states,
+            solution and len(node_to_path(solution)),
+            visited,
+        )
+    )
+    start: MCState = MCState(MISSIONARIES, CANNIBALS, True)
+    solution, visited = external_bfs(
+        start,
+        MCState.goal_test,
+        MCState.successors,
+        encode_mc,
+        decode_mc,
+        memory_records=16,
+    )
+    print(
+        "missionaries: external path {} ({} states)".format(
+            solution and len(node_to_path(solution)), visited
+        )
+    )
@@ -13,9 +13,17 @@ from typing import (
     Optional,
     Union,
     Tuple,
+    Generator,
+    Iterator,
+    Hashable,
 )
 from typing_extensions import Protocol
-from heapq import heappush, heappop
+from heapq import heapify, heappush, heappop
+from array import array
+from collections import OrderedDict
+from itertools import islice
+from operator import attrgetter
+import struct
 import time
 
 T = TypeVar("T")
@@ -70,6 +78,9 @@ class Stack(Generic[T]):
     def empty(self) -> bool:
         return not self._container  # not is true for empty container
 
+    def __len__(self) -> int:
+        return len(self._container)
+
     def push(self, item: T) -> None:
         self._container.append(item)
 
@@ -88,7 +99,7 @@ class Queue(Generic[T]):
     def empty(self) -> bool:
         return not self._container  # not is true for empty container
 
-    def __len__(self) -> bool:
+    def __len__(self) -> int:
         return len(self._container)
 
     def push(self, item: T) -> None:
@@ -109,17 +120,25 @@ class PriorityQueue(Generic[T]):
     def empty(self) -> bool:
         return not self._container  # not is true for empty container
 
+    def __len__(self) -> int:
+        return len(self._container)
+
     def push(self, item: T) -> None:
         heappush(self._container, item)  # in by priority
 
     def pop(self) -> T:
         return heappop(self._container)  # out by priority
 
+    def peek(self) -> T:
+        return self._container[0]  # next out, left in place
+
     def __repr__(self) -> str:
         return repr(self._container)
 
 
 class Node(Generic[T]):
+    __slots__ = ("state", "parent", "cost", "heuristic")
+
     def __init__(
         self,
         state: T,
@@ -136,40 +155,438 @@ class Node(Generic[T]):
         return (self.cost + self.heuristic) < (other.cost + other.heuristic)
 
 
-def dfs(
+# parent of the initial state in searches that link states, not nodes
+_NO_PARENT: Any = object()
+
+
+class NodeArena(Generic[T]):
+    """
+    Search nodes stored column-wise: node i is states[i], parents[i] (index
+    of the parent, -1 for the root) and, for weighted searches, costs[i] and
+    heuristics[i]. A node is one list slot plus 8 (or 24) bytes of arrays,
+    instead of a Node object with its own attribute storage.
+    With decode, states holds compact keys and decode turns them back into
+    states for paths and nodes.
+    """
+
+    __slots__ = ("states", "parents", "costs", "heuristics", "decode")
+
+    def __init__(
+        self, weighted: bool = False, decode: Optional[Callable[[Any], T]] = None
+    ) -> None:
+        self.states: List[Any] = []
+        self.parents: array = array("q")
+        # dfs doesn't need costs, so it doesn't pay for them
+        self.costs: Optional[array] = array("d") if weighted else None
+        self.heuristics: Optional[array] = array("d") if weighted else None
+        self.decode: Optional[Callable[[Any], T]] = decode
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def add(
+        self, state: T, parent: int = -1, cost: float = 0.0, heuristic: float = 0.0
+    ) -> int:
+        self.states.append(state)
+        self.parents.append(parent)
+        if self.costs is not None:
+            self.costs.append(cost)
+            self.heuristics.append(heuristic)
+        return len(self.states) - 1
+
+    def path(self, index: int) -> List[T]:
+        path: List[T] = []
+        # follow integer parent links back to the root
+        while index != -1:
+            path.append(self.states[index])
+            index = self.parents[index]
+        path.reverse()
+        if self.decode is not None:
+            return [self.decode(state) for state in path]
+        return path
+
+    def node(self, index: int) -> ArenaNode[T]:
+        return ArenaNode(self, index)
+
+
+class ArenaNode(Generic[T]):
+    """Read-only Node look-alike over one NodeArena slot."""
+
+    __slots__ = ("_arena", "_index")
+
+    def __init__(self, arena: NodeArena[T], index: int) -> None:
+        self._arena: NodeArena[T] = arena
+        self._index: int = index
+
+    @property
+    def state(self) -> T:
+        state: Any = self._arena.states[self._index]
+        decode: Optional[Callable[[Any], T]] = self._arena.decode
+        return state if decode is None else decode(state)
+
+    @property
+    def parent(self) -> Optional[ArenaNode[T]]:
+        parent: int = self._arena.parents[self._index]
+        return None if parent == -1 else ArenaNode(self._arena, parent)
+
+    @property
+    def cost(self) -> float:
+        costs: Optional[array] = self._arena.costs
+        if costs is not None:
+            return costs[self._index]
+        # unweighted search, the cost is the depth: count the parent links
+        parents: array = self._arena.parents
+        depth: int = 0
+        index: int = parents[self._index]
+        while index != -1:
+            depth += 1
+            index = parents[index]
+        return float(depth)
+
+    @property
+    def heuristic(self) -> float:
+        heuristics: Optional[array] = self._arena.heuristics
+        return 0.0 if heuristics is None else heuristics[self._index]
+
+    def __lt__(self, other: ArenaNode) -> bool:
+        return (self.cost + self.heuristic) < (other.cost + other.heuristic)
+
+    def __repr__(self) -> str:
+        return "ArenaNode({!r}, cost={})".format(self.state, self.cost)
+
+
+class SearchStats(Generic[T]):
+    """
+    Optional observer shared by dfs, bfs and astar. Searches call
+    expanded_node() once per expanded node, goals included, and only when a
+    SearchStats is passed, so a search without one pays a single
+    `is not None` check per node.
+
+    - expanded / generated / duplicates: nodes popped, successors produced and
+      successors skipped because they were already explored
+    - frontier_peak: largest frontier size seen
+    - sample_every: every that many expansions, the average time per
+      expansion since the previous sample goes into samples (seconds)
+    - progress_every / progress: progress(stats, state) is called every that
+      many expansions; subclasses can override on_progress instead
+    """
+
+    __slots__ = (
+        "expanded",
+        "generated",
+        "duplicates",
+        "frontier_peak",
+        "sample_every",
+        "samples",
+        "progress_every",
+        "progress",
+        "_last_sample",
+    )
+
+    def __init__(
+        self,
+        sample_every: int = 0,
+        progress_every: int = 0,
+        progress: Optional[Callable[[SearchStats[T], T], None]] = None,
+    ) -> None:
+        self.expanded: int = 0
+        self.generated: int = 0
+        self.duplicates: int = 0
+        self.frontier_peak: int = 0
+        self.sample_every: int = sample_every
+        self.samples: List[float] = []
+        self.progress_every: int = progress_every
+        self.progress: Optional[Callable[[SearchStats[T], T], None]] = progress
+        self._last_sample: float = time.perf_counter()
+
+    def expanded_node(
+        self, state: T, generated: int, duplicates: int, frontier_size: int
+    ) -> None:
+        self.expanded += 1
+        self.generated_nodes(generated, duplicates, frontier_size)
+        if self.sample_every and self.expanded % self.sample_every == 0:
+            now: float = time.perf_counter()
+            self.samples.append((now - self._last_sample) / self.sample_every)
+            self._last_sample = now
+        if self.progress_every and self.expanded % self.progress_every == 0:
+            self.on_progress(state)
+
+    def generated_nodes(
+        self, generated: int, duplicates: int, frontier_size: int
+    ) -> None:
+        """Children of a node expanded_node already counted, like a goal."""
+        self.generated += generated
+        self.duplicates += duplicates
+        if frontier_size > self.frontier_peak:
+            self.frontier_peak = frontier_size
+
+    def on_progress(self, state: T) -> None:
+        if self.progress is not None:
+            self.progress(self, state)
+
+    @property
+    def average_time(self) -> Optional[float]:
+        """Mean seconds per expansion over the sampled windows."""
+        return sum(self.samples) / len(self.samples) if self.samples else None
+
+    def __repr__(self) -> str:
+        return (
+            "SearchStats(expanded={}, generated={}, duplicates={}, frontier_peak={})"
+        ).format(self.expanded, self.generated, self.duplicates, self.frontier_peak)
+
+
+def _fields_getter(attributes: Optional[Sequence[str]]) -> Callable[[Any], Sequence]:
+    if attributes is None:
+        return tuple  # the state is a tuple already
+    if len(attributes) == 1:  # attrgetter of one name returns a bare value
+        name: str = attributes[0]
+        return lambda state: (getattr(state, name),)
+    return attrgetter(*attributes)
+
+
+class FieldPacker(Generic[T]):
+    """
+    Packs a state made of small non-negative ints (bools included) into one
+    int, `bits` bits per field, for the key / from_key of dfs, bfs and astar.
+    Fields are the items of a tuple or NamedTuple such as MazeLocation, or
+    the given attributes of any other object; unpack calls factory with them.
+    pack raises ValueError for values outside 0 .. 2 ** bits - 1.
+    """
+
+    __slots__ = ("factory", "fields", "bits", "_mask", "_get")
+
+    def __init__(
+        self,
+        factory: Callable[..., T],
+        fields: int,
+        bits: int = 16,
+        attributes: Optional[Sequence[str]] = None,
+    ) -> None:
+        if attributes is not None and len(attributes) != fields:
+            raise ValueError(
+                "{} attributes for {} fields".format(len(attributes), fields)
+            )
+        self.factory: Callable[..., T] = factory
+        self.fields: int = fields
+        self.bits: int = bits
+        self._mask: int = (1 << bits) - 1
+        self._get: Callable[[T], Sequence[int]] = _fields_getter(attributes)
+
+    def pack(self, state: T) -> int:
+        packed: int = 0
+        for value in self._get(state):
+            if not 0 <= value <= self._mask:
+                # it would spill into the next field and collide with other keys
+                raise ValueError(
+                    "{!r} doesn't fit in {} bits: {}".format(value, self.bits, state)
+                )
+            packed = (packed << self.bits) | value
+        return packed
+
+    def unpack(self, packed: int) -> T:
+        values: List[int] = []
+        for _ in range(self.fields):
+            values.append(packed & self._mask)
+            packed >>= self.bits
+        values.reverse()
+        return self.factory(*values)
+
+
+class StructPacker(Generic[T]):
+    """
+    Like FieldPacker, but to bytes with a struct format, e.g. ">hh" for
+    MazeLocation, when fields can be negative, floats or don't fit in bits.
+    """
+
+    __slots__ = ("factory", "_struct", "_get")
+
+    def __init__(
+        self,
+        factory: Callable[..., T],
+        format: str,
+        attributes: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.factory: Callable[..., T] = factory
+        self._struct: struct.Struct = struct.Struct(format)
+        self._get: Callable[[T], Sequence[Any]] = _fields_getter(attributes)
+
+    def pack(self, state: T) -> bytes:
+        return self._struct.pack(*self._get(state))
+
+    def unpack(self, packed: bytes) -> T:
+        return self.factory(*self._struct.unpack(packed))
+
+
+def _check_key(
+    key: Optional[Callable[[T], Hashable]], from_key: Optional[Callable[[Any], T]]
+) -> None:
+    if from_key is not None and key is None:
+        raise ValueError("from_key needs a key to invert")
+
+
+def print_progress(stats: SearchStats[T], state: T) -> None:
+    """progress callback that prints what the old verbose bfs printed."""
+    print("Current Node:\n", state)
+    print("Visited states: ", stats.expanded)
+    print("Generated states: ", stats.generated)
+    print("Skipped states: ", stats.duplicates)
+    print("Frontier peak: ", stats.frontier_peak)
+    print("Average time per loop: ", stats.average_time)
+    print("-" * 20)
+
+
+def dfs_goals(
     initial: T,
     goal_test: Callable[[T], bool],
     successors: Callable[[T], List[T]],
-    return_visited_states: bool = False,
-) -> Optional[Node[T]]:
+    stats: Optional[SearchStats[T]] = None,
+    key: Optional[Callable[[T], Hashable]] = None,
+    from_key: Optional[Callable[[Any], T]] = None,
+) -> Generator[Tuple[ArenaNode[T], int], None, None]:
     """
-    Generalized Deep-First Search Algorithm.
+    dfs that doesn't stop at the first goal: yields (goal node, states
+    visited so far) for every goal state reached, lazily, going on with the
+    same search when asked for the next one.
     """
-    # frontier is where we've yet to go
-    frontier: Stack[Node[T]] = Stack()
-    frontier.push(Node(initial, None))  # Set inicial state on frontier
+    _check_key(key, from_key)
+    arena: NodeArena[T] = NodeArena(decode=from_key)
+    initial_key: Hashable = initial if key is None else key(initial)
+    # frontier is where we've yet to go (arena indexes, not node objects)
+    frontier: Stack[int] = Stack()
+    # Set inicial state on frontier
+    frontier.push(arena.add(initial if from_key is None else initial_key))
     # explored is where we've been
-    explored: Set[T] = {initial}  # We start already at initial state
+    explored: Set[Hashable] = {initial_key}  # We start already at initial state
     visited_states: int = 0
 
     # keep going while there is more to explore
     while not frontier.empty:
         # remove the node from stack to analyze
-        current_node: Node[T] = frontier.pop()
+        current_index: int = frontier.pop()
         visited_states += 1  # add one more visited state
-        current_state: T = current_node.state
-        # if we found the goal, we're done
-        if goal_test(current_state):
-            return (current_node, visited_states)
+        current_state: T = arena.states[current_index]
+        if from_key is not None:
+            current_state = from_key(current_state)
+        # if we found a goal, count it and hand it out, then keep going from it
+        is_goal: bool = goal_test(current_state)
+        if is_goal:
+            if stats is not None:
+                stats.expanded_node(current_state, 0, 0, len(frontier))
+            yield (arena.node(current_index), visited_states)
         # check where we can go next and haven't explored
         # remember that each successor is already a valid one
         # (ex: in maze problem, a blocked cell is not a valid successor)
-        for child in successors(current_state):
-            if child in explored:  # skip children we already explored
+        children: List[T] = successors(current_state)
+        arena_size: int = len(arena)
+        for child in children:
+            child_key: Hashable = child if key is None else key(child)
+            if child_key in explored:  # skip children we already explored
                 continue
-            explored.add(child)
-            frontier.push(Node(child, current_node))  # add node to frontier
-    return (None, None)  # went through everything and never found goal
+            explored.add(child_key)
+            # add node to frontier
+            frontier.push(
+                arena.add(child if from_key is None else child_key, current_index)
+            )
+        if stats is not None:
+            added: int = len(arena) - arena_size
+            if is_goal:  # counted as expanded before it was handed out
+                stats.generated_nodes(
+                    len(children), len(children) - added, len(frontier)
+                )
+            else:
+                stats.expanded_node(
+                    current_state, len(children), len(children) - added, len(frontier)
+                )
+
+
+def dfs(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    return_visited_states: bool = False,
+    stats: Optional[SearchStats[T]] = None,
+    key: Optional[Callable[[T], Hashable]] = None,
+    from_key: Optional[Callable[[Any], T]] = None,
+) -> Optional[ArenaNode[T]]:
+    """
+    Generalized Deep-First Search Algorithm.
+    key maps states to what explored stores (say a FieldPacker's pack) instead
+    of the states themselves; with from_key (its unpack) too, the nodes keep
+    only keys and states are rebuilt when expanded.
+    """
+    # the first goal, or (None, None) when it went through everything
+    return next(
+        dfs_goals(initial, goal_test, successors, stats, key, from_key), (None, None)
+    )
+
+
+def bfs_goals(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    stats: Optional[SearchStats[T]] = None,
+    key: Optional[Callable[[T], Hashable]] = None,
+    from_key: Optional[Callable[[Any], T]] = None,
+) -> Generator[Tuple[Node[T], int], None, None]:
+    """
+    bfs yielding (goal node, states visited so far) for every goal state, by
+    increasing depth, as in dfs_goals.
+    """
+    _check_key(key, from_key)
+    # what the frontier and the parent links hold: keys when from_key can
+    # turn them back into states, the states themselves otherwise
+    stored: Hashable = initial if from_key is None else key(initial)
+    # frontier is where we've yet to go
+    frontier: Queue[Any] = Queue()
+    frontier.push(stored)
+    # explored is where we've been, mapped to where we came from: one dict is
+    # both the explored set and the parent links, with no node per state
+    explored: Dict[Hashable, Any] = {
+        initial if key is None else key(initial): _NO_PARENT
+    }
+    # parent links hold states to look up by key only with key but no from_key
+    lookup: Optional[Callable[[T], Hashable]] = key if from_key is None else None
+    visited_states: int = 0
+
+    # keep going while there is more to explore
+    while not frontier.empty:
+        current: Any = frontier.pop()  # takes from the left!
+        current_state: T = current if from_key is None else from_key(current)
+        visited_states += 1  # add one more visited state
+        # if we found a goal, count it and hand it out, then keep going from it
+        is_goal: bool = goal_test(current_state)
+        if is_goal:
+            if stats is not None:
+                stats.expanded_node(current_state, 0, 0, len(frontier))
+            path: List[Any] = []
+            step: Any = current
+            while step is not _NO_PARENT:
+                path.append(step)
+                step = explored[step if lookup is None else lookup(step)]
+            node: Optional[Node[T]] = None
+            for depth, step in enumerate(reversed(path)):
+                state: T = step if from_key is None else from_key(step)
+                node = Node(state, node, float(depth))
+            yield (node, visited_states)
+        # check where we can go next and haven't explored
+        children: List[T] = successors(current_state)
+        explored_size: int = len(explored)
+        for child in children:
+            child_key: Hashable = child if key is None else key(child)
+            if child_key in explored:  # skip children we already explored
+                continue
+            explored[child_key] = current
+            frontier.push(child if from_key is None else child_key)
+        if stats is not None:
+            added: int = len(explored) - explored_size
+            if is_goal:  # counted as expanded before it was handed out
+                stats.generated_nodes(
+                    len(children), len(children) - added, len(frontier)
+                )
+            else:
+                stats.expanded_node(
+                    current_state, len(children), len(children) - added, len(frontier)
+                )
 
 
 def bfs(
@@ -177,52 +594,108 @@ def bfs(
     goal_test: Callable[[T], bool],
     successors: Callable[[T], List[T]],
     verbose: bool = False,
+    stats: Optional[SearchStats[T]] = None,
+    key: Optional[Callable[[T], Hashable]] = None,
+    from_key: Optional[Callable[[Any], T]] = None,
 ) -> Optional[Node[T]]:
     """
     Generalized Breadth-First Search Algorithm.
+    verbose=True is a shortcut for SearchStats printing after every node.
+    key and from_key work as in dfs. Returns a plain Node chain along the path.
     """
-    # frontier is where we've yet to go
-    frontier: Queue[Node[T]] = Queue()
-    frontier.push(Node(initial, None))
-    # explored is where we've been
-    explored: Set[T] = {initial}
+    if verbose and stats is None:
+        stats = SearchStats(sample_every=100, progress_every=1, progress=print_progress)
+    # the first goal, or (None, None) when it went through everything
+    return next(
+        bfs_goals(initial, goal_test, successors, stats, key, from_key), (None, None)
+    )
+
+
+def unit_cost(parent: T, child: T) -> float:
+    return 1.0  # every step costs the same, like a grid
+
+
+def astar_goals(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    heuristic: Callable[[T], float],
+    stats: Optional[SearchStats[T]] = None,
+    cost: Callable[[T, T], float] = unit_cost,
+    weight: float = 1.0,
+    key: Optional[Callable[[T], Hashable]] = None,
+    from_key: Optional[Callable[[Any], T]] = None,
+) -> Generator[Tuple[ArenaNode[T], int], None, None]:
+    """
+    astar yielding (goal node, states visited so far) for every goal state,
+    cheapest first when the heuristic is consistent and admissible for the
+    nearest goal, as in dfs_goals.
+    """
+    _check_key(key, from_key)
+    arena: NodeArena[T] = NodeArena(weighted=True, decode=from_key)
+    # frontier is where we've yet to go, as (f, h, arena index)
+    frontier: PriorityQueue[Tuple[float, float, int]] = PriorityQueue()
+    initial_key: Hashable = initial if key is None else key(initial)
+    initial_heuristic: float = heuristic(initial)
+    initial_index: int = arena.add(
+        initial if from_key is None else initial_key, -1, 0.0, initial_heuristic
+    )
+    frontier.push((weight * initial_heuristic, initial_heuristic, initial_index))
+    # explored is where we've been: best known cost and the arena slot holding it
+    explored: Dict[Hashable, Tuple[float, int]] = {initial_key: (0.0, initial_index)}
+    closed: Set[Hashable] = set()
     visited_states: int = 0
-    times: List[float] = []
-    skipped: int = 0
 
     # keep going while there is more to explore
     while not frontier.empty:
-        t1 = time.time()
-        current_node: Node[T] = frontier.pop()  # takes from the left!
-        if verbose:  # and visited_states % 100000 == 0 and visited_states > 0:
-            print("Current Node:\n", current_node.state)
-            print("Visited states: ", visited_states)
-            print("States explored: ", len(explored))
-            print("Skipped states: ", skipped)
-            print(
-                "Average time per loop: ",
-                sum(times) / len(times) if len(times) > 0 else None,
-            )
-            print()
-            # input("Press enter to continue...")
+        current_index: int = frontier.pop()[2]
+        current_state: T = arena.states[current_index]
+        current_key: Hashable = current_state
+        if from_key is not None:
+            current_state = from_key(current_key)
+        elif key is not None:
+            current_key = key(current_state)
+        if current_key in closed or explored[current_key][1] != current_index:
+            continue  # stale entry, a cheaper path to this state was pushed later
+        closed.add(current_key)
         visited_states += 1  # add one more visited state
-        current_state: T = current_node.state
-        # if we found the goal, we're done
-        if goal_test(current_state):
-            return (current_node, visited_states)
+        # if we found a goal, count it and hand it out, then keep going from it
+        is_goal: bool = goal_test(current_state)
+        if is_goal:
+            if stats is not None:
+                stats.expanded_node(current_state, 0, 0, len(frontier))
+            yield (arena.node(current_index), visited_states)
         # check where we can go next and haven't explored
-        successors_nodes = successors(current_state)
-        if verbose:
-            print("Number of successors: ", len(successors_nodes))
-            print("-" * 20)
-        for child in successors_nodes:
-            if child in explored:  # skip children we already explored
-                skipped += 1
+        current_cost: float = arena.costs[current_index]
+        children: List[T] = successors(current_state)
+        arena_size: int = len(arena)
+        for child in children:
+            child_key: Hashable = child if key is None else key(child)
+            if child_key in closed:
                 continue
-            explored.add(child)
-            frontier.push(Node(child, current_node))
-        times.append((time.time() - t1) * 1000)  # in ms
-    return (None, None)  # went through everything and never found goal
+            new_cost: float = current_cost + cost(current_state, child)
+            if child_key not in explored or explored[child_key][0] > new_cost:
+                child_heuristic: float = heuristic(child)
+                child_index: int = arena.add(
+                    child if from_key is None else child_key,
+                    current_index,
+                    new_cost,
+                    child_heuristic,
+                )
+                explored[child_key] = (new_cost, child_index)
+                frontier.push(
+                    (new_cost + weight * child_heuristic, child_heuristic, child_index)
+                )
+        if stats is not None:
+            added: int = len(arena) - arena_size
+            if is_goal:  # counted as expanded before it was handed out
+                stats.generated_nodes(
+                    len(children), len(children) - added, len(frontier)
+                )
+            else:
+                stats.expanded_node(
+                    current_state, len(children), len(children) - added, len(frontier)
+                )
 
 
 def astar(
@@ -231,35 +704,546 @@ def astar(
     successors: Callable[[T], List[T]],
     heuristic: Callable[[T], float],
     return_visited_states: bool = False,
-) -> Optional[Node[T]]:
-    # frontier is where we've yet to go
-    frontier: PriorityQueue[Node[T]] = PriorityQueue()
-    frontier.push(Node(initial, None, 0.0, heuristic(initial)))
-    # explored is where we've been
-    explored: Dict[T, float] = {initial: 0.0}
+    stats: Optional[SearchStats[T]] = None,
+    cost: Callable[[T, T], float] = unit_cost,
+    weight: float = 1.0,
+    key: Optional[Callable[[T], Hashable]] = None,
+    from_key: Optional[Callable[[Any], T]] = None,
+) -> Optional[ArenaNode[T]]:
+    """
+    A* with step costs cost(parent, child). weight > 1 gives weighted A*
+    (f = g + weight * h): fewer expansions, paths at most weight times longer
+    than optimal. Heap entries that a cheaper path has since replaced, and
+    states already expanded, are skipped when popped instead of re-expanded.
+    Ties on f go to the smaller h, then to the older entry.
+    key and from_key work as in dfs.
+    """
+    goals: Generator[Tuple[ArenaNode[T], int], None, None] = astar_goals(
+        initial, goal_test, successors, heuristic, stats, cost, weight, key, from_key
+    )
+    # the first goal, or (None, None) when it went through everything
+    return next(goals, (None, None))
+
+
+def shortest_simple_paths(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    heuristic: Callable[[T], float],
+    cost: Callable[[T, T], float] = unit_cost,
+) -> Generator[Tuple[List[T], float], None, None]:
+    """
+    Yen's algorithm over astar: yields (path, cost) for loopless paths from
+    initial to a goal, cheapest first, each one only when asked for. Every
+    next path is a detour from an accepted one: for each state along it (the
+    spur), astar runs from the spur with the states before it removed and
+    the moves the accepted paths make from there banned. Removing states
+    only lengthens distances, so an admissible heuristic stays admissible.
+    """
+    first, _ = astar(initial, goal_test, successors, heuristic, cost=cost)
+    if first is None:
+        return
+    accepted: List[List[T]] = [node_to_path(first)]
+    yield (accepted[0], first.cost)
+    # candidate detours as (cost, tie-breaker, path), plus the paths seen
+    candidates: List[Tuple[float, int, List[T]]] = []
+    seen: Set[Tuple[T, ...]] = {tuple(accepted[0])}
+    while True:
+        last: List[T] = accepted[-1]
+        root_cost: float = 0.0
+        for i in range(len(last) - 1):
+            spur: T = last[i]
+            root: List[T] = last[: i + 1]
+            # moves already taken from this root by the paths handed out
+            banned: Set[T] = {
+                other[i + 1]
+                for other in accepted
+                if len(other) > i + 1 and other[: i + 1] == root
+            }
+            removed: Set[T] = set(root[:-1])
+
+            def spur_successors(state: T) -> List[T]:
+                children: List[T] = successors(state)
+                if state == spur:
+                    children = [child for child in children if child not in banned]
+                return [child for child in children if child not in removed]
+
+            detour, _ = astar(spur, goal_test, spur_successors, heuristic, cost=cost)
+            if detour is not None:
+                path: List[T] = root[:-1] + node_to_path(detour)
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heappush(candidates, (root_cost + detour.cost, len(seen), path))
+            root_cost += cost(last[i], last[i + 1])
+        if not candidates:
+            return  # every simple path has been handed out
+        path_cost, _, path = heappop(candidates)
+        accepted.append(path)
+        yield (path, path_cost)
+
+
+def k_shortest_paths(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    heuristic: Callable[[T], float],
+    k: int,
+    cost: Callable[[T, T], float] = unit_cost,
+) -> List[Tuple[List[T], float]]:
+    """Up to k cheapest loopless paths as (path, cost), from shortest_simple_paths."""
+    paths: Generator[Tuple[List[T], float], None, None] = shortest_simple_paths(
+        initial, goal_test, successors, heuristic, cost
+    )
+    return list(islice(paths, k))
+
+
+def anytime_astar(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    heuristic: Callable[[T], float],
+    cost: Callable[[T, T], float] = unit_cost,
+    weights: Sequence[float] = (3.0, 2.0, 1.5, 1.25, 1.0),
+    time_budget: Optional[float] = None,
+) -> Generator[Tuple[ArenaNode[T], int, float], None, None]:
+    """
+    Anytime Repairing A* (ARA*): a weighted A* with the first weight, then
+    each lower weight reuses the previous search instead of starting over.
+    After every round that has a path, yields (goal node, states expanded
+    so far, weight), the path being within weight of optimal. If time_budget
+    seconds run out mid-round, a path improved in that round is yielded with
+    the previous round's bound (inf if there is none) and the search stops.
+    """
+    deadline: Optional[float] = (
+        None if time_budget is None else time.perf_counter() + time_budget
+    )
+    arena: NodeArena[T] = NodeArena(weighted=True)
+    initial_heuristic: float = heuristic(initial)
+    initial_index: int = arena.add(initial, -1, 0.0, initial_heuristic)
+    best: Dict[T, int] = {initial: initial_index}  # arena slot of the cheapest path
+    frontier: List[Tuple[float, float, int]] = []
+    inconsistent: Set[T] = set()  # improved after being expanded in this round
+    goal_index: int = -1
+    yielded_index: int = -1
     visited_states: int = 0
 
-    # keep going while there is more to explore
-    while not frontier.empty:
-        current_node: Node[T] = frontier.pop()
-        visited_states += 1  # add one more visited state
-        current_state: T = current_node.state
-        # if we found the goal, we're done
-        if goal_test(current_state):
-            return (current_node, visited_states)
-        # check where we can go next and haven't explored
-        for child in successors(current_state):
-            new_cost: float = (
-                current_node.cost + 1
-            )  # 1 assumes a grid, need a cost function for more sophisticated apps
-
-            if child not in explored or explored[child] > new_cost:
-                explored[child] = new_cost
-                frontier.push(Node(child, current_node, new_cost, heuristic(child)))
+    weight: float = weights[0]
+    heappush(frontier, (weight * initial_heuristic, initial_heuristic, initial_index))
+    for round_number, weight in enumerate(weights):
+        if round_number > 0:
+            # repair: re-key the open list with the new weight, add back the
+            # inconsistent states, and allow everything to be expanded again
+            open_states: Set[T] = {arena.states[i] for _, _, i in frontier}
+            open_states |= inconsistent
+            frontier = []
+            for state in open_states:
+                index: int = best[state]
+                h: float = arena.heuristics[index]
+                frontier.append((arena.costs[index] + weight * h, h, index))
+            heapify(frontier)
+            inconsistent = set()
+        closed: Set[T] = set()
+        while frontier:
+            goal_cost: float = (
+                arena.costs[goal_index] if goal_index != -1 else float("inf")
+            )
+            if frontier[0][0] >= goal_cost:
+                break  # nothing left can beat the path we have, for this weight
+            if deadline is not None and time.perf_counter() > deadline:
+                if goal_index != yielded_index:
+                    bound: float = (
+                        weights[round_number - 1] if round_number > 0 else float("inf")
+                    )
+                    yield (arena.node(goal_index), visited_states, bound)
+                return
+            current_index: int = heappop(frontier)[2]
+            current_state: T = arena.states[current_index]
+            if current_state in closed or best[current_state] != current_index:
+                continue  # stale entry
+            closed.add(current_state)
+            visited_states += 1
+            current_cost: float = arena.costs[current_index]
+            if goal_test(current_state):
+                if current_cost < goal_cost:
+                    goal_index = current_index
+                continue
+            for child in successors(current_state):
+                new_cost: float = current_cost + cost(current_state, child)
+                if child in best and arena.costs[best[child]] <= new_cost:
+                    continue
+                child_heuristic: float = heuristic(child)
+                child_index: int = arena.add(
+                    child, current_index, new_cost, child_heuristic
+                )
+                best[child] = child_index
+                if child in closed:
+                    inconsistent.add(child)
+                else:
+                    f: float = new_cost + weight * child_heuristic
+                    heappush(frontier, (f, child_heuristic, child_index))
+        # nothing left to expand or repair: the path is optimal whatever the weight
+        exhausted: bool = not frontier and not inconsistent
+        if goal_index != -1:
+            yield (arena.node(goal_index), visited_states, 1.0 if exhausted else weight)
+            yielded_index = goal_index
+        if exhausted:
+            return
+
+
+def _join_paths(
+    forward: NodeArena[T],
+    forward_index: int,
+    backward: NodeArena[T],
+    backward_index: int,
+) -> ArenaNode[T]:
+    """
+    Hang the backward half (meeting state to goal) under the forward slot of
+    the meeting state, so the result reads initial -> goal like any search.
+    """
+    previous: int = backward_index
+    index: int = backward.parents[backward_index]
+    while index != -1:
+        if forward.costs is None:
+            forward_index = forward.add(backward.states[index], forward_index)
+        else:
+            new_cost: float = forward.costs[forward_index] + (
+                backward.costs[previous] - backward.costs[index]
+            )
+            forward_index = forward.add(backward.states[index], forward_index, new_cost)
+        previous, index = index, backward.parents[index]
+    return forward.node(forward_index)
+
+
+def bidirectional_bfs(
+    initial: T,
+    goal: T,
+    successors: Callable[[T], List[T]],
+    predecessors: Optional[Callable[[T], List[T]]] = None,
+    stats: Optional[SearchStats[T]] = None,
+) -> Optional[ArenaNode[T]]:
+    """
+    Breadth-first search from both ends, a whole layer at a time from the
+    side with the smaller frontier, until the two meet: two balls of radius
+    d / 2 instead of one of radius d. The first meeting is a shortest path.
+    predecessors(state) lists the states with a move into state; it defaults
+    to successors, which is right for reversible problems like Maze.
+    Needs the goal state itself rather than a goal test.
+    """
+    expand: Tuple[Callable[[T], List[T]], ...] = (
+        successors,
+        predecessors or successors,
+    )
+    arenas: Tuple[NodeArena[T], NodeArena[T]] = (NodeArena(), NodeArena())
+    frontiers: Tuple[Queue[int], Queue[int]] = (Queue(), Queue())
+    # explored maps each state to its arena slot, one dict per direction
+    explored: Tuple[Dict[T, int], Dict[T, int]] = ({}, {})
+    for side, root in enumerate((initial, goal)):
+        explored[side][root] = arenas[side].add(root)
+        frontiers[side].push(explored[side][root])
+    if initial == goal:
+        return (arenas[0].node(0), 0)
+    visited_states: int = 0
+
+    # keep going while both sides have somewhere left to go
+    while not frontiers[0].empty and not frontiers[1].empty:
+        side: int = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        arena: NodeArena[T] = arenas[side]
+        frontier: Queue[int] = frontiers[side]
+        own: Dict[T, int] = explored[side]
+        other: Dict[T, int] = explored[1 - side]
+        for _ in range(len(frontier)):  # exactly one layer
+            current_index: int = frontier.pop()
+            current_state: T = arena.states[current_index]
+            visited_states += 1
+            children: List[T] = expand[side](current_state)
+            arena_size: int = len(arena)
+            meeting: Optional[Tuple[int, int]] = None
+            for child in children:
+                if child in own:
+                    continue
+                own[child] = arena.add(child, current_index)
+                if child in other:  # the searches met
+                    meeting = (own[child], other[child])
+                    break
+                frontier.push(own[child])
+            if stats is not None:
+                added: int = len(arena) - arena_size
+                stats.expanded_node(
+                    current_state, len(children), len(children) - added, len(frontier)
+                )
+            if meeting is not None:
+                forward_index, backward_index = meeting if side == 0 else meeting[::-1]
+                return (
+                    _join_paths(arenas[0], forward_index, arenas[1], backward_index),
+                    visited_states,
+                )
+    return (None, None)  # one side ran out of states, so there is no path
+
+
+def bidirectional_astar(
+    initial: T,
+    goal: T,
+    successors: Callable[[T], List[T]],
+    heuristic: Callable[[T], float],
+    reverse_heuristic: Callable[[T], float],
+    predecessors: Optional[Callable[[T], List[T]]] = None,
+    cost: Callable[[T, T], float] = unit_cost,
+    stats: Optional[SearchStats[T]] = None,
+) -> Optional[ArenaNode[T]]:
+    """
+    Front-to-end bidirectional A*: a forward A* guided by heuristic (estimate
+    to goal) and a backward one over predecessors guided by reverse_heuristic
+    (estimate to initial), expanding from the side with the smaller frontier.
+    Every time a state is reached from both sides the meeting path is kept
+    if cheaper, and the search stops once the lowest f of either frontier
+    can't beat it. Optimal for consistent heuristics like manhattan_distance.
+    """
+    expand: Tuple[Callable[[T], List[T]], ...] = (
+        successors,
+        predecessors or successors,
+    )
+    estimate: Tuple[Callable[[T], float], ...] = (heuristic, reverse_heuristic)
+    arenas: Tuple[NodeArena[T], NodeArena[T]] = (
+        NodeArena(weighted=True),
+        NodeArena(weighted=True),
+    )
+    frontiers: Tuple[PriorityQueue[Tuple[float, float, int]], ...] = (
+        PriorityQueue(),
+        PriorityQueue(),
+    )
+    # best known cost and arena slot of every reached state, per direction
+    explored: Tuple[Dict[T, Tuple[float, int]], ...] = ({}, {})
+    closed: Tuple[Set[T], Set[T]] = (set(), set())
+    for side, root in enumerate((initial, goal)):
+        root_heuristic: float = estimate[side](root)
+        root_index: int = arenas[side].add(root, -1, 0.0, root_heuristic)
+        explored[side][root] = (0.0, root_index)
+        frontiers[side].push((root_heuristic, root_heuristic, root_index))
+    meeting: Optional[Tuple[int, int]] = (0, 0) if initial == goal else None
+    meeting_cost: float = 0.0 if initial == goal else float("inf")
+    visited_states: int = 0
+
+    while not frontiers[0].empty and not frontiers[1].empty:
+        if max(frontiers[0].peek()[0], frontiers[1].peek()[0]) >= meeting_cost:
+            break  # no path left in either frontier is cheaper than the meeting
+        side: int = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        arena: NodeArena[T] = arenas[side]
+        frontier: PriorityQueue[Tuple[float, float, int]] = frontiers[side]
+        own: Dict[T, Tuple[float, int]] = explored[side]
+        other: Dict[T, Tuple[float, int]] = explored[1 - side]
+        current_index: int = frontier.pop()[2]
+        current_state: T = arena.states[current_index]
+        if current_state in closed[side] or own[current_state][1] != current_index:
+            continue  # stale entry
+        closed[side].add(current_state)
+        visited_states += 1
+        current_cost: float = arena.costs[current_index]
+        children: List[T] = expand[side](current_state)
+        arena_size: int = len(arena)
+        for child in children:
+            if child in closed[side]:
+                continue
+            # backward edges are forward moves from child into current_state
+            step: float = (
+                cost(current_state, child) if side == 0 else cost(child, current_state)
+            )
+            new_cost: float = current_cost + step
+            if child in own and own[child][0] <= new_cost:
+                continue
+            child_heuristic: float = estimate[side](child)
+            child_index: int = arena.add(
+                child, current_index, new_cost, child_heuristic
+            )
+            own[child] = (new_cost, child_index)
+            frontier.push((new_cost + child_heuristic, child_heuristic, child_index))
+            if child in other and new_cost + other[child][0] < meeting_cost:
+                meeting_cost = new_cost + other[child][0]
+                meeting = (child_index, other[child][1])
+                if side == 1:
+                    meeting = meeting[::-1]
+        if stats is not None:
+            added: int = len(arena) - arena_size
+            stats.expanded_node(
+                current_state, len(children), len(children) - added, len(frontier)
+            )
+    if meeting is None:
+        return (None, None)  # went through everything and never met
+    return (_join_paths(arenas[0], meeting[0], arenas[1], meeting[1]), visited_states)
+
+
+class TranspositionTable(Generic[T]):
+    """
+    Bounded map from state to the cheapest cost it was reached with, for the
+    depth-first searches: a state reached again at no lower cost can't lead
+    anywhere new, so it is pruned. When full, the least recently touched
+    state is dropped, which only costs pruning, never correctness.
+    """
+
+    __slots__ = ("maxsize", "_costs")
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive: {}".format(maxsize))
+        self.maxsize: int = maxsize
+        self._costs: OrderedDict[T, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._costs)
+
+    def improves(self, state: T, cost: float) -> bool:
+        """Record cost for state unless it was already reached as cheaply."""
+        known: Optional[float] = self._costs.get(state)
+        if known is not None and known <= cost:
+            self._costs.move_to_end(state)
+            return False
+        self._costs[state] = cost
+        self._costs.move_to_end(state)
+        if len(self._costs) > self.maxsize:
+            self._costs.popitem(last=False)
+        return True
+
+    def clear(self) -> None:
+        self._costs.clear()
+
+
+def _bounded_dfs(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    heuristic: Callable[[T], float],
+    cost: Callable[[T, T], float],
+    bound: float,
+    table: Optional[TranspositionTable[T]],
+    stats: Optional[SearchStats[T]],
+) -> Tuple[Optional[List[T]], List[float], int, float]:
+    """
+    One depth-first pass that skips children with cost + heuristic > bound.
+    Memory is the current path and one child iterator per level, whatever
+    the size of the state space. Returns (path to a goal or None, costs
+    along it, states expanded, smallest f that was over the bound).
+    """
+    path: List[T] = [initial]
+    costs: List[float] = [0.0]
+    on_path: Set[T] = {initial}  # never walk in a cycle
+    visited_states: int = 1
+    next_bound: float = float("inf")
+    if goal_test(initial):
+        if stats is not None:
+            stats.expanded_node(initial, 0, 0, len(path))
+        return (path, costs, visited_states, next_bound)
+    children: List[T] = successors(initial)
+    if stats is not None:
+        stats.expanded_node(initial, len(children), 0, len(path))
+    # one iterator over the children still to try per level of path
+    pending: List[Iterator[T]] = [iter(children)]
+
+    while pending:
+        child: Optional[T] = next(pending[-1], None)
+        if child is None:  # this level is done, backtrack
+            pending.pop()
+            on_path.discard(path.pop())
+            costs.pop()
+            continue
+        new_cost: float = costs[-1] + cost(path[-1], child)
+        f: float = new_cost + heuristic(child)
+        if f > bound:
+            next_bound = min(next_bound, f)
+            continue
+        if child in on_path or (
+            table is not None and not table.improves(child, new_cost)
+        ):
+            if stats is not None:
+                stats.duplicates += 1
+            continue
+        path.append(child)
+        costs.append(new_cost)
+        on_path.add(child)
+        visited_states += 1
+        if goal_test(child):
+            if stats is not None:
+                stats.expanded_node(child, 0, 0, len(path))
+            return (path, costs, visited_states, next_bound)
+        children = successors(child)
+        if stats is not None:
+            stats.expanded_node(child, len(children), 0, len(path))
+        pending.append(iter(children))
+    return (None, costs, visited_states, next_bound)
+
+
+def idastar(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    heuristic: Callable[[T], float],
+    cost: Callable[[T, T], float] = unit_cost,
+    max_bound: float = float("inf"),
+    table_size: int = 0,
+    stats: Optional[SearchStats[T]] = None,
+) -> Optional[Node[T]]:
+    """
+    Iterative-deepening A*: depth-first passes bounded by f = cost + heuristic,
+    each bound being the smallest f that went over the previous one. Optimal
+    for admissible heuristics, and memory stays linear in the solution depth
+    instead of holding an explored set and a frontier. States are re-expanded
+    across passes; table_size > 0 keeps a TranspositionTable of that many
+    states (cleared every pass) to prune repeats within a pass.
+    Gives up past max_bound. Returns (Node, states expanded in all passes).
+    """
+    table: Optional[TranspositionTable[T]] = (
+        TranspositionTable(table_size) if table_size > 0 else None
+    )
+    bound: float = heuristic(initial)
+    visited_states: int = 0
+    while bound <= max_bound:
+        if table is not None:
+            table.clear()  # costs recorded under a smaller bound don't prune now
+        path, costs, visited, bound = _bounded_dfs(
+            initial, goal_test, successors, heuristic, cost, bound, table, stats
+        )
+        visited_states += visited
+        if path is not None:
+            node: Optional[Node[T]] = None
+            for state, state_cost in zip(path, costs):
+                node = Node(state, node, state_cost, heuristic(state))
+            return (node, visited_states)
+        if bound == float("inf"):
+            break  # nothing was cut off, so there's nothing left to try
     return (None, None)  # went through everything and never found goal
 
 
-def node_to_path(node: Node[T]) -> List[T]:
+def _no_heuristic(state: T) -> float:
+    return 0.0
+
+
+def iddfs(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    max_depth: Optional[int] = None,
+    table_size: int = 0,
+    stats: Optional[SearchStats[T]] = None,
+) -> Optional[Node[T]]:
+    """
+    Iterative-deepening depth-first search: depth-limited dfs with limits
+    0, 1, 2, ... up to max_depth. Finds a shortest path like bfs with the
+    memory of dfs. It is idastar without a heuristic, see there for
+    table_size.
+    """
+    return idastar(
+        initial,
+        goal_test,
+        successors,
+        _no_heuristic,
+        unit_cost,
+        float("inf") if max_depth is None else max_depth,
+        table_size,
+        stats,
+    )
+
+
+def node_to_path(node: Union[Node[T], ArenaNode[T]]) -> List[T]:
+    if isinstance(node, ArenaNode):
+        return node._arena.path(node._index)  # integer links, no node objects
     path: List[T] = [node.state]
     # work backwards from end to front
     while node.parent is not None:
@@ -0,0 +1,179 @@
+from __future__ import annotations
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Set, Type, TypeVar
+import math
+import os
+import random
+import time
+
+from generic_search import ArenaNode, NodeArena, SearchStats, bfs, node_to_path
+from p2_maze import Maze, MazeLocation
+from exercise_3 import MCState, MISSIONARIES, CANNIBALS
+
+T = TypeVar("T")
+
+POOLS: Dict[str, Type[Executor]] = {
+    "process": ProcessPoolExecutor,
+    "thread": ThreadPoolExecutor,
+}
+
+# successors function of this worker process, set once by the pool initializer
+# so batches only carry states, not (say) a whole pickled Maze every time
+_installed: Optional[Callable] = None
+
+
+def _install(successors: Callable[[T], List[T]]) -> None:
+    global _installed
+    _installed = successors
+
+
+def _expand(
+    states: Sequence[T], successors: Optional[Callable[[T], List[T]]] = None
+) -> List[List[T]]:
+    expand: Callable[[T], List[T]] = successors or _installed
+    return [expand(state) for state in states]
+
+
+def parallel_bfs(
+    initial: T,
+    goal_test: Callable[[T], bool],
+    successors: Callable[[T], List[T]],
+    workers: int = 2,
+    pool: str = "process",
+    batches_per_worker: int = 4,
+    serial_below: int = 32,
+    stats: Optional[SearchStats[T]] = None,
+) -> Optional[ArenaNode[T]]:
+    """
+    Level-synchronous breadth-first search: the successors of a whole
+    frontier level are computed in batches on a process (or thread) pool,
+    while goal tests, deduplication and parent links stay in this process.
+    Children are merged back in frontier order, so the path and the visited
+    count are exactly those of serial bfs. Levels smaller than serial_below
+    are expanded here, since shipping them would cost more than it saves.
+    With processes, successors and the states must be picklable.
+    """
+    if pool not in POOLS:
+        raise ValueError("Invalid pool:{}".format(pool))
+    arena: NodeArena[T] = NodeArena()
+    explored: Set[T] = {initial}
+    level: List[int] = [arena.add(initial)]
+    visited_states: int = 0
+
+    with POOLS[pool](
+        max_workers=workers, initializer=_install, initargs=(successors,)
+    ) as executor:
+        # threads share this module, so they get successors passed explicitly
+        expand_batch: Callable[[Sequence[T]], List[List[T]]] = (
+            partial(_expand, successors=successors) if pool == "thread" else _expand
+        )
+        while level:
+            # goal tests in the order serial bfs would pop the level
+            for position, index in enumerate(level):
+                visited_states += 1
+                if goal_test(arena.states[index]):
+                    if stats is not None:
+                        # serial bfs expanded the states popped before the
+                        # goal, and the goal; count them, without children
+                        for popped in level[: position + 1]:
+                            stats.expanded_node(arena.states[popped], 0, 0, len(level))
+                    return (arena.node(index), visited_states)
+            states: List[T] = [arena.states[index] for index in level]
+            if len(states) < serial_below:
+                expanded: List[List[T]] = _expand(states, successors)
+            else:
+                size: int = math.ceil(len(states) / (workers * batches_per_worker))
+                batches: List[List[T]] = [
+                    states[start : start + size]
+                    for start in range(0, len(states), size)
+                ]
+                expanded = [
+                    children
+                    for batch in executor.map(expand_batch, batches)
+                    for children in batch
+                ]
+            next_level: List[int] = []
+            for parent, state, children in zip(level, states, expanded):
+                arena_size: int = len(arena)
+                for child in children:
+                    if child in explored:  # skip children we already explored
+                        continue
+                    explored.add(child)
+                    next_level.append(arena.add(child, parent))
+                if stats is not None:
+                    added: int = len(arena) - arena_size
+                    stats.expanded_node(
+                        state, len(children), len(children) - added, len(next_level)
+                    )
+            level = next_level
+    return (None, None)  # went through everything and never found goal
+
+
+class BusySuccessors:
+    """
+    Wraps a successors function to spin for `seconds` per call, standing in
+    for an expensive one. A class rather than a closure so it pickles.
+    """
+
+    def __init__(self, successors: Callable[[T], List[T]], seconds: float) -> None:
+        self.successors: Callable[[T], List[T]] = successors
+        self.seconds: float = seconds
+
+    def __call__(self, state: T) -> List[T]:
+        deadline: float = time.perf_counter() + self.seconds
+        while time.perf_counter() < deadline:
+            pass
+        return self.successors(state)
+
+
+def benchmark(
+    worker_counts: Sequence[int] = (1, 2, 4),
+    pools: Sequence[str] = ("process", "thread"),
+    busy: float = 0.0001,
+) -> None:
+    """
+    Speedup of parallel_bfs over serial bfs on a Maze and on MCState, with
+    the plain successors and with successors made `busy` seconds slower.
+    Only the busy ones have enough work per state to pay for the batching.
+    """
+    random.seed(42)
+    maze: Maze = Maze(120, 120, 0.2, MazeLocation(0, 0), MazeLocation(119, 119))
+    mc: MCState = MCState(MISSIONARIES, CANNIBALS, True)
+    workloads = [
+        ("maze", maze.start, maze.goal_test, maze.successors),
+        ("mc", mc, MCState.goal_test, MCState.successors),
+    ]
+    print("{} CPUs available".format(os.cpu_count()))
+    for name, initial, goal_test, successors in workloads:
+        for slow in (0.0, busy):
+            expand = BusySuccessors(successors, slow) if slow else successors
+            start: float = time.perf_counter()
+            reference, visited = bfs(initial, goal_test, expand)
+            serial: float = time.perf_counter() - start
+            print(
+                "{} (+{}s per successors call): serial bfs {:.3f}s, {} states".format(
+                    name, slow, serial, visited
+                )
+            )
+            for pool in pools:
+                for workers in worker_counts:
+                    start = time.perf_counter()
+                    solution, _ = parallel_bfs(
+                        initial, goal_test, expand, workers=workers, pool=pool
+                    )
+                    taken: float = time.perf_counter() - start
+                    same: bool = (
+                        solution is None
+                        if reference is None
+                        else node_to_path(solution) == node_to_path(reference)
+                    )
+                    print(
+                        "    {} x{}: {:.3f}s (speedup {:.2f}x, same path: {})".format(
+                            pool, workers, taken, serial / taken, same
+                        )
+                    )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,264 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from multiprocessing.connection import Connection, wait
+import multiprocessing
+import random
+import time
+
+from generic_search import SearchStats, astar, bfs, dfs, node_to_path
+from p2_maze import Maze, MazeLocation, euclidean_distance, manhattan_distance
+
+# fork hands every worker the problem as it is, closures (heuristics, bound
+# methods) included, with nothing to pickle but the results coming back
+_CONTEXT = multiprocessing.get_context(
+    "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+)
+
+
+class Strategy(NamedTuple):
+    """
+    One entry of a portfolio: runs as
+        search(initial, goal_test, successors, *args, stats=stats, **kwargs)
+    so any of the generic_search searches returning (node, visited) fits.
+    """
+
+    name: str
+    search: Callable[..., Tuple[Any, Optional[int]]]
+    args: Tuple[Any, ...] = ()
+    kwargs: Dict[str, Any] = {}
+
+
+class StrategyResult(NamedTuple):
+    name: str
+    status: str  # "solved", "no solution", "cancelled", "crashed: ..." or "error: ..."
+    path: Optional[List[Any]]
+    cost: Optional[float]
+    visited: Optional[int]
+    seconds: float
+    expanded: int  # SearchStats counters, last reported ones when cancelled
+    generated: int
+    duplicates: int
+    frontier_peak: int
+
+
+class PortfolioResult(NamedTuple):
+    winner: Optional[StrategyResult]
+    results: List[StrategyResult]  # one per strategy, in portfolio order
+
+    def report(self) -> str:
+        header: str = "{:<24} {:<12} {:>8} {:>10} {:>10} {:>10}"
+        lines: List[str] = [
+            header.format(
+                "strategy", "status", "cost", "expanded", "generated", "time (s)"
+            )
+        ]
+        for r in self.results:
+            lines.append(
+                "{:<24} {:<12} {:>8} {:>10} {:>10} {:>10.3f}".format(
+                    r.name,
+                    r.status[:12],
+                    "-" if r.cost is None else round(r.cost, 2),
+                    r.expanded,
+                    r.generated,
+                    r.seconds,
+                )
+            )
+        if self.winner is not None:
+            lines.append("winner: {}".format(self.winner.name))
+        return "\n".join(lines)
+
+
+def _counters(stats: SearchStats) -> Tuple[int, int, int, int]:
+    return (stats.expanded, stats.generated, stats.duplicates, stats.frontier_peak)
+
+
+def _run_strategy(
+    strategy: Strategy,
+    initial: Any,
+    goal_test: Callable[[Any], bool],
+    successors: Callable[[Any], List[Any]],
+    results: Connection,
+    progress_every: int,
+) -> None:
+    """Worker process body: run one strategy and send back what happened."""
+
+    def progress(stats: SearchStats, state: Any) -> None:
+        results.send(("progress", _counters(stats)))
+
+    stats: SearchStats = SearchStats(progress_every=progress_every, progress=progress)
+    start: float = time.perf_counter()
+    try:
+        node, visited = strategy.search(
+            initial,
+            goal_test,
+            successors,
+            *strategy.args,
+            stats=stats,
+            **strategy.kwargs,
+        )
+    except Exception as error:  # reported, not raised: the race goes on
+        node, visited, status = None, None, "error: {!r}".format(error)
+    else:
+        status = "no solution" if node is None else "solved"
+    results.send(
+        (
+            "done",
+            StrategyResult(
+                strategy.name,
+                status,
+                None if node is None else node_to_path(node),
+                None if node is None else node.cost,
+                visited,
+                time.perf_counter() - start,
+                *_counters(stats),
+            ),
+        )
+    )
+
+
+def race(
+    initial: Any,
+    goal_test: Callable[[Any], bool],
+    successors: Callable[[Any], List[Any]],
+    strategies: Sequence[Strategy],
+    best: bool = False,
+    deadline: Optional[float] = None,
+    progress_every: int = 1000,
+) -> PortfolioResult:
+    """
+    Run every strategy at once, each in its own process, on the same problem.
+    By default the first strategy to find a path wins and the others are
+    terminated; with best=True all of them run (until deadline seconds, if
+    given) and the cheapest path wins. Either way, whatever is still running
+    at the deadline is terminated. Strategies report their SearchStats every
+    progress_every expansions, so cancelled ones still show how far they got.
+    A strategy whose process dies without reporting is "crashed: <exit code>".
+    """
+    if not strategies:
+        raise ValueError("no strategies to race")
+    names: List[str] = [strategy.name for strategy in strategies]
+    if len(set(names)) != len(names):
+        raise ValueError("strategy names must be unique: {}".format(names))
+    start: float = time.perf_counter()
+    end: Optional[float] = None if deadline is None else start + deadline
+    workers: Dict[str, multiprocessing.Process] = {}
+    # one pipe per worker: a worker that dies shows up as the end of its pipe,
+    # and killing one can't corrupt what the others send
+    pending: Dict[Connection, str] = {}
+    for strategy in strategies:
+        reader, writer = _CONTEXT.Pipe(duplex=False)
+        workers[strategy.name] = _CONTEXT.Process(
+            target=_run_strategy,
+            args=(strategy, initial, goal_test, successors, writer, progress_every),
+            daemon=True,
+        )
+        workers[strategy.name].start()
+        # close our end right away, so workers started later don't inherit it
+        # and the pipe ends when its own worker does
+        writer.close()
+        pending[reader] = strategy.name
+
+    finished: Dict[str, StrategyResult] = {}
+    last_seen: Dict[str, Tuple[int, int, int, int]] = {}
+
+    def receive(reader: Connection) -> Optional[StrategyResult]:
+        """Handle one message from reader; the result once its worker is done."""
+        name: str = pending[reader]
+        try:
+            message: Tuple = reader.recv()
+        except EOFError:  # exited without reporting: killed, os._exit, ...
+            del pending[reader]
+            reader.close()
+            workers[name].join()
+            finished[name] = StrategyResult(
+                name,
+                "crashed: {}".format(workers[name].exitcode),
+                None,
+                None,
+                None,
+                time.perf_counter() - start,
+                *last_seen.get(name, (0,) * 4),
+            )
+            return finished[name]
+        if message[0] == "progress":
+            last_seen[name] = message[1]
+            return None
+        del pending[reader]
+        reader.close()
+        finished[name] = message[1]
+        return finished[name]
+
+    winner: Optional[StrategyResult] = None
+    while pending:
+        timeout: Optional[float] = None if end is None else end - time.perf_counter()
+        if timeout is not None and timeout <= 0:
+            break
+        ready: List[Any] = wait(list(pending), timeout)
+        if not ready:
+            break  # deadline
+        for reader in ready:
+            result: Optional[StrategyResult] = receive(reader)
+            if result is None or result.path is None:
+                continue
+            if winner is None or (best and result.cost < winner.cost):
+                winner = result
+        if winner is not None and not best:
+            break
+
+    # read what the losers already sent, then cancel them: they are still
+    # alive, so no message is left half written
+    for reader in list(pending):
+        while reader in pending and reader.poll():
+            receive(reader)
+    for name, worker in workers.items():
+        if worker.is_alive():
+            worker.terminate()
+        worker.join()
+    for reader in pending:
+        reader.close()
+    taken: float = time.perf_counter() - start
+    report: List[StrategyResult] = [
+        (
+            finished[name]
+            if name in finished
+            else StrategyResult(
+                name,
+                "cancelled",
+                None,
+                None,
+                None,
+                taken,
+                *last_seen.get(name, (0,) * 4),
+            )
+        )
+        for name in names
+    ]
+    return PortfolioResult(winner, report)
+
+
+def maze_portfolio(m: Maze) -> List[Strategy]:
+    """The searches exercise_2 compares, plus weighted A*, as a portfolio."""
+    return [
+        Strategy("dfs", dfs),
+        Strategy("bfs", bfs),
+        Strategy("astar manhattan", astar, (manhattan_distance(m.goal),)),
+        Strategy("astar euclidean", astar, (euclidean_distance(m.goal),)),
+        Strategy(
+            "weighted astar 2",
+            astar,
+            (manhattan_distance(m.goal),),
+            {"weight": 2.0},
+        ),
+    ]
+
+
+if __name__ == "__main__":
+    random.seed(1)
+    m: Maze = Maze(300, 300, 0.2, MazeLocation(0, 0), MazeLocation(299, 299))
+    print("first result:")
+    print(race(m.start, m.goal_test, m.successors, maze_portfolio(m)).report())
+    print("\nbest result within 2 seconds:")
+    result: PortfolioResult = race(
+        m.start, m.goal_test, m.successors, maze_portfolio(m), best=True, deadline=2.0
+    )
+    print(result.report())